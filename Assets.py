@@ -0,0 +1,188 @@
+# Assets.py
+'''
+Loading for the small sprites (platforms, tokens, obstacles, icons and the player). Instead of opening and decoding around 30 tiny PNGs one at a time, they are packed
+into one atlas image (spriteAtlas.png) with an index of where each one is (spriteAtlas.json). The game loads the atlas with a single decode and every sprite is a
+subsurface of it, so they all share one surface.
+The big menu and background images are kept in a cache of already decoded pixels in the display's format (imageCache.bin, indexed by imageCache.json). The cache
+file is memory-mapped and each surface is made straight from its bytes, so no PNG has to be decoded. Each entry remembers the modification time, size and hash of
+its PNG; if the time changed but the hash didn't (e.g. after a fresh checkout) it is still used, otherwise the PNGs are decoded and the cache is rebuilt.
+The atlas and the cache are rebuilt automatically when they are out of date, or they can be built ahead of time with:
+    python Assets.py
+'''
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+from pygame import *
+
+ATLASIMAGE = "spriteAtlas.png"
+ATLASINDEX = "spriteAtlas.json"
+ATLASWIDTH = 256    # wide enough for a few of the longest platforms in a row
+
+CACHEDATA = "imageCache.bin"
+CACHEINDEX = "imageCache.json"
+CACHEFORMAT = "BGRA"    # the byte order of the display's 32 bit format, so the surfaces don't need converting
+
+# the sprite files in the game, in the order that Game.py uses them
+platSprites = ["shortgrass", "medgrass", "longgrass", "shortspace", "medspace", "longspace", "shortspacebreak", "medspacebreak", "longspacebreak", "shortgrassbreak", "medgrassbreak", "longgrassbreak"]
+toks = ["jetpack", "jump", "star", "tnt"]
+obsSprites = ["laser", "spikeShort", "spikeMed", "spikeLong", "laserEnd"]
+icons = ["jumpFilled", "jumpEmpty", "heartFilled", "heartEmpty"]    # icons that keep track of lives and extra jumps
+playerFiles = ["playerRight.png", "playerLeft.png"]
+
+spriteFiles = [sprite + "Plat.png" for sprite in platSprites] + [t + "Tok.png" for t in toks] + [o + ".png" for o in obsSprites] + [i + ".png" for i in icons] + playerFiles
+
+# the big images, which go in the image cache
+menus = ["main", "instruction", "difficulty", "gameover"]
+backgrounds = ["star", "sky", "skydark", "starlight"]
+bigFiles = [m + "Menu.png" for m in menus] + [back + "Back.png" for back in backgrounds]
+
+cacheMap = None    # the memory-mapped cache, which the cached surfaces use as their pixels so it has to stay open
+
+
+def packAtlas(files):
+    '''
+    Loads the sprite files and packs them into rows of one surface, tallest first so that each row wastes less space.
+    Returns the atlas and the index: {file: [x, y, width, height]}
+    '''
+    sprites = {}
+    for f in files:
+        sprites[f] = image.load(f).convert_alpha()
+
+    index = {}
+    x = 0
+    y = 0
+    rowHeight = 0
+    for f in sorted(files, key = lambda f: sprites[f].get_height(), reverse = True):
+        w, h = sprites[f].get_size()
+        if x + w > ATLASWIDTH:    # starts a new row
+            x = 0
+            y += rowHeight
+            rowHeight = 0
+        index[f] = [x, y, w, h]
+        x += w
+        rowHeight = max(rowHeight, h)
+
+    atlas = Surface((ATLASWIDTH, y + rowHeight), SRCALPHA).convert_alpha()
+    for f in files:
+        # BLEND_RGBA_MAX copies the pixels as they are onto the empty atlas instead of blending them with it
+        atlas.blit(sprites[f], index[f][:2], special_flags = BLEND_RGBA_MAX)
+
+    return atlas, index
+
+
+def atlasUpToDate(files):
+    # whether the atlas exists and was built after every sprite was last changed
+    if not os.path.exists(ATLASIMAGE) or not os.path.exists(ATLASINDEX):
+        return False
+    built = min(os.path.getmtime(ATLASIMAGE), os.path.getmtime(ATLASINDEX))
+    for f in files:
+        if os.path.getmtime(f) > built:
+            return False
+    return True
+
+
+def saveAtlas(atlas, index):
+    image.save(atlas, ATLASIMAGE)
+    with open(ATLASINDEX, "w") as indexFile:
+        json.dump(index, indexFile)
+
+
+def loadSprites(files = spriteFiles):
+    '''
+    Returns {file: sprite} for the sprite files, as subsurfaces of the atlas. The display has to be set up first.
+    If the atlas is out of date, the sprites are loaded one at a time and packed, and the atlas is saved for the next start
+    '''
+    index = None
+    if atlasUpToDate(files):
+        with open(ATLASINDEX) as indexFile:
+            index = json.load(indexFile)
+
+    if index is not None and all(f in index for f in files):
+        atlas = image.load(ATLASIMAGE).convert_alpha()
+    else:
+        atlas, index = packAtlas(files)
+        try:
+            saveAtlas(atlas, index)
+        except (OSError, error):    # the game still works without a saved atlas, it just starts slower next time
+            pass
+
+    sprites = {}
+    for f in files:
+        sprites[f] = atlas.subsurface(index[f])
+    return sprites
+
+
+def fileHash(f):
+    with open(f, "rb") as source:
+        return hashlib.sha1(source.read()).hexdigest()
+
+
+def cacheEntryValid(f, entry):
+    # whether a cache entry still matches its PNG - the hash is only worked out if the modification time or size changed
+    stat = os.stat(f)
+    if entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+        return True
+    return entry["size"] == stat.st_size and entry["hash"] == fileHash(f)
+
+
+def buildImageCache(files):
+    '''
+    Decodes the PNGs, writes their pixels one after another into the cache file and returns {file: surface}
+    '''
+    surfaces = {}
+    index = {}
+    offset = 0
+    with open(CACHEDATA, "wb") as data:
+        for f in files:
+            surfaces[f] = image.load(f).convert_alpha()
+            pixels = image.tobytes(surfaces[f], CACHEFORMAT)
+            data.write(pixels)
+            stat = os.stat(f)
+            index[f] = {"mtime": stat.st_mtime, "size": stat.st_size, "hash": fileHash(f), "offset": offset, "length": len(pixels), "width": surfaces[f].get_width(), "height": surfaces[f].get_height()}
+            offset += len(pixels)
+
+    with open(CACHEINDEX, "w") as indexFile:
+        json.dump(index, indexFile)
+    return surfaces
+
+
+def loadImages(files = bigFiles):
+    '''
+    Returns {file: surface} for the big images, made from the memory-mapped cache when it is up to date, otherwise decoded from the PNGs (and the cache is rebuilt)
+    '''
+    global cacheMap
+    index = None
+    if os.path.exists(CACHEINDEX) and os.path.exists(CACHEDATA):
+        with open(CACHEINDEX) as indexFile:
+            index = json.load(indexFile)
+
+    if index is not None and all(f in index and cacheEntryValid(f, index[f]) for f in files):
+        with open(CACHEDATA, "rb") as data:
+            cacheMap = mmap.mmap(data.fileno(), 0, access = mmap.ACCESS_COPY)    # copy-on-write, so the surfaces can be drawn on without changing the file
+        pixels = memoryview(cacheMap)
+        surfaces = {}
+        for f in files:
+            entry = index[f]
+            surfaces[f] = image.frombuffer(pixels[entry["offset"]:entry["offset"] + entry["length"]], (entry["width"], entry["height"]), CACHEFORMAT)
+        return surfaces
+
+    try:
+        return buildImageCache(files)
+    except (OSError, error):    # the game still works without the cache, it just starts slower next time
+        surfaces = {}
+        for f in files:
+            surfaces[f] = image.load(f).convert_alpha()
+        return surfaces
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    display.set_mode((1, 1))    # convert_alpha() needs a display
+    atlas, index = packAtlas(spriteFiles)
+    saveAtlas(atlas, index)
+    print(f"packed {len(index)} sprites into {ATLASIMAGE} ({atlas.get_width()}x{atlas.get_height()})")
+    buildImageCache(bigFiles)
+    print(f"cached {len(bigFiles)} images in {CACHEDATA} ({os.path.getsize(CACHEDATA)} bytes)")
@@ -0,0 +1,164 @@
+# Autopilot.py
+'''
+A player that plays the game by itself, for load tests, demos and fast-forwarded headless runs:
+    python Simulation.py hard 20000 autoplay
+    python Game.py autoplay
+The jumps the player can make are worked out once, by the JumpArcs in Simulation.py ("arcs") that move a real Player, so the gravity, jump speed, jump
+cancelling and double jumps are exactly the game's. Each kind of jump (a full jump, a jump cancelled on each frame it can be, and a full jump with a double jump
+at the top) is a table of the frame on which the player would land on a platform at each height above its feet. Choosing where to jump is then a table lookup for every platform
+and kind of jump instead of simulating any jumps, so the autopilot takes a tiny part of a frame.
+When it is standing on a platform it jumps to the highest platform it can land on, cancelling or double jumping as the table says, and moves left or right
+towards the platform while in the air. The player only moves 10 pixels a frame sideways (Player.maxSpeed), which is used to check whether a platform is close
+enough, going off the side of the screen if that is shorter. The heights in the table also give where the player will be on every frame of the jump, so jumps
+that would go through a spike or a laser on the way are passed over.
+'''
+
+from Simulation import *
+
+DANGER = 1000    # how much worse a platform with an obstacle on it is than one without
+DOUBLECOST = 150    # how much higher a platform has to be to be worth using up a double jump
+CHECKED = 20    # how many of the best jumps are checked for obstacles on the way, so a screen full of lasers can't make a frame slow
+STEERSLACK = 6    # how close the centres of the player and the platform have to be for the player to stop moving sideways
+
+
+def sideways(fromX, toX):
+    # how far the player's centre has to move (negative for left) to get from fromX to toX, going off the side of the screen if that is shorter
+    toX = min(max(toX, 57 / 2 - 56), WIDTH - 1 + 57 / 2)    # the player is never left further off the screen than this
+    distance = toX - fromX
+    if distance > 0 and WRAPLEFT - distance < distance:
+        return distance - WRAPLEFT
+    if distance < 0 and WRAPRIGHT + distance < -distance:
+        return distance + WRAPRIGHT
+    return distance
+
+
+def platformCentre(plat, frames):
+    # where the centre of a platform will be after "frames" frames - moving platforms move 2 pixels a frame along their path
+    x = plat.rect[X]
+    if plat.mode == MOVE:
+        if plat.dir == "R":
+            x = min(x + 2 * frames, plat.endPos[X])
+        else:
+            x = max(x - 2 * frames, plat.startPos[X])
+    return x + plat.rect[2] / 2
+
+
+class Autopilot():
+    '''
+    Plays one game: inputs(game) gives the Inputs for the next frame, so "autopilot.inputs" can be given to runHeadless as the controller
+    '''
+    def __init__(self):
+        self.target = None    # the platform that the player is jumping to
+        self.arc = None    # how the player is jumping to it
+        self.frame = 0    # the frame of the jump
+
+    def inputs(self, game):
+        game.sync()    # the platforms' rects are needed
+        player = game.player
+        inputs = Inputs()
+
+        if player.collision and player.vel.y == 0:    # standing on a platform, so it's time for the next jump
+            self.choose(game)
+            if self.target is not None:
+                inputs.space = True
+        elif self.target is not None:
+            self.frame += 1
+            if self.target.dead:
+                self.target = None
+            elif self.frame == self.arc.cancel:
+                inputs.spaceUp = True
+            elif self.frame == self.arc.double:
+                inputs.space = True
+
+        target = self.target
+        if target is None and not player.collision:    # knocked off course (TNT, a jetpack, a platform breaking), so it heads for the nearest platform below
+            target = self.catch(game)
+        if target is not None:
+            distance = sideways(player.rect.centerx, platformCentre(target, 0))
+            inputs.left = distance < -STEERSLACK
+            inputs.right = distance > STEERSLACK
+        return inputs
+
+    def choose(self, game):
+        '''
+        Picks the platform to jump to and how: the highest one that one of the jumps lands on, that the player can get across to in time, and that doesn't go
+        through an obstacle on the way
+        '''
+        player = game.player
+        feet = player.rect.bottom
+        jumps = []    # (score, platform, arc, landing frame) for every jump that lands
+        for plat in game.platforms:
+            if plat.dead or (plat.mode == BREAK and not plat.visible):
+                continue
+            rise = feet - plat.rect.top
+            if abs(rise) <= 2 and plat.rect.colliderect(player.rect.move(0, 1)):    # the platform the player is standing on
+                continue
+            for arc in arcs:
+                if arc.double is not None and game.jumps == 0:
+                    continue
+                frame = arc.landingFrame(rise)
+                if frame is None:
+                    continue
+                # the player has to get far enough across for the rects to overlap, moving on every frame up to landing
+                across = abs(sideways(player.rect.centerx, platformCentre(plat, frame))) - (player.rect[2] + plat.rect[2]) / 2 + STEERSLACK
+                if across > player.maxSpeed * (frame + 1):
+                    continue
+
+                score = rise - frame    # as high as possible, and sooner is better
+                if plat.obstacle != "none":
+                    score -= DANGER
+                if arc.double is not None:
+                    score -= DOUBLECOST
+                jumps.append((score, plat, arc, frame))
+
+        self.frame = 0
+        self.target = None
+        self.arc = None
+        dangers = [obst.rect for obst in game.obsList if not obst.dead]
+        jumps.sort(key = lambda jump: jump[0], reverse = True)
+        for score, plat, arc, frame in jumps[:CHECKED]:
+            if self.clear(player, plat, arc, frame, dangers):
+                self.target = plat
+                self.arc = arc
+                return
+        if jumps:    # every jump goes through something, so it takes the best one anyway rather than waiting to scroll off the bottom
+            self.target, self.arc = jumps[0][1], jumps[0][2]
+
+    def clear(self, player, plat, arc, frame, dangers):
+        # whether the player misses every obstacle on the way to the platform, moving across as fast as it can until it is over the platform
+        if not dangers:
+            return True
+        rect = player.rect.copy()
+        startX = rect[X]
+        startY = rect[Y]
+        distance = sideways(rect.centerx, platformCentre(plat, frame))
+        for i in range(frame + 1):
+            moved = min(abs(distance), player.maxSpeed * (i + 1))
+            if distance < 0:
+                moved = -moved
+            rect[X] = startX + moved
+            if rect[X] >= WIDTH:    # the player comes back in on the other side of the screen
+                rect[X] -= WRAPRIGHT
+            elif rect.right <= 0:
+                rect[X] += WRAPLEFT
+            rect[Y] = startY - arc.heights[i]
+            if rect.collidelist(dangers) != -1:
+                return False
+        return True
+
+    def catch(self, game):
+        # the platform below the player's feet that is closest, counting how far across it is
+        player = game.player
+        feet = player.rect.bottom
+        best = None
+        bestScore = None
+        for plat in game.platforms:
+            if plat.dead or plat.rect.top < feet or (plat.mode == BREAK and not plat.visible):
+                continue
+            score = plat.rect.top - feet + abs(sideways(player.rect.centerx, plat.rect.centerx))
+            if plat.obstacle != "none":
+                score += DANGER
+            if bestScore is None or score < bestScore:
+                best = plat
+                bestScore = score
+        return best
@@ -0,0 +1,272 @@
+# Benchmark.py
+'''
+Times the game loop by playing scripted scenarios with no window (the screen is drawn off the screen), so the speed of two versions of the game can be compared.
+Each frame is split into the parts that GameState.step() and drawGame() report (scroll, generate, collide, score, draw, hud, blit) plus flipping, and for every part the p50/p95/p99/max
+time over the run is worked out along with how many platforms, TNT, tokens and obstacles there were. The results are printed and saved as JSON:
+    python Benchmark.py [scenario ...] [--scale 0.1] [--arrays] [--chunks] [--no-draw] [--out benchmark.json]
+    python Benchmark.py --compare old.json new.json
+Every scenario uses a fixed seed, so the same scenario plays out the same way on every run.
+'''
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import random as rand    # random is star-imported by the game's modules, so the module itself is kept under another name
+from time import perf_counter, perf_counter_ns
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")    # never opens a window
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from Simulation import *
+
+SEED = 2023
+PERCENTILES = [50, 95, 99]
+LISTNAMES = ["platforms", "TNT", "tokens", "obstacles"]    # in the same order as listList
+
+
+class PhaseTimes():
+    '''
+    Collects how long each part of every frame took. It is used as the GameState's profiler, and the drawing is added to it by the benchmark
+    '''
+    def __init__(self):
+        self.times = {}    # phase: [nanoseconds for each frame]
+        self.frameTime = 0    # the total for the current frame so far
+
+    def add(self, phase, nanoseconds):
+        if phase not in self.times:
+            self.times[phase] = []
+        self.times[phase].append(nanoseconds)
+        self.frameTime += nanoseconds
+
+    def endFrame(self):
+        # records the whole frame's time as the "frame" phase
+        if "frame" not in self.times:
+            self.times["frame"] = []
+        self.times["frame"].append(self.frameTime)
+        self.frameTime = 0
+
+
+def percentile(ordered, p):
+    # the nearest-rank percentile of a sorted list
+    return ordered[max(0, ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(samples, scale = 1):
+    # p50/p95/p99/max/mean of a list of numbers, multiplied by "scale"
+    ordered = sorted(samples)
+    summary = {}
+    for p in PERCENTILES:
+        summary[f"p{p}"] = percentile(ordered, p) * scale
+    summary["max"] = ordered[-1] * scale
+    summary["mean"] = sum(ordered) / len(ordered) * scale
+    return summary
+
+
+# the scripted player, and things the scenarios do to the game every frame
+
+def climber(game, rnd):
+    '''
+    Jumps whenever it can and moves towards the lowest platform above the player, so the game keeps scrolling, re-centering and generating like a real climb
+    '''
+    game.sync()
+    player = game.player
+    target = None
+    for plat in game.platforms:
+        if not plat.dead and player.rect[Y] - 250 < plat.rect[Y] < player.rect.bottom - 20:
+            if target is None or plat.rect[Y] > target.rect[Y]:
+                target = plat
+
+    inputs = Inputs()
+    if target is not None:
+        inputs.left = target.rect.centerx < player.rect.centerx - 10
+        inputs.right = target.rect.centerx > player.rect.centerx + 10
+    inputs.space = player.vel.y == 0 or (player.vel.y > 0 and game.jumps > 0 and rnd.random() < 0.1)
+    inputs.spaceUp = player.vel.y < -15 and rnd.random() < 0.05
+    return inputs
+
+
+def revive(game):
+    # puts the player back in the middle of the screen with full lives instead of ending the game, so a scenario can run for as long as it needs to
+    game.over = False
+    game.lives = 5
+    game.player.pos[X] = WIDTH / 2
+    game.player.pos[Y] = HEIGHT / 3
+    game.player.vel = vec(0, 0)
+
+
+def jetpackBursts(game, rnd):
+    # starts the jetpack every 4 seconds, which generates platforms in the 3 + 3 + 5 bursts
+    if game.frames % (4 * FPS) == 0:
+        game.player.jetpack = True
+
+
+def tntChains(game, rnd):
+    # every 45 frames puts a stack of TNT on the player, which blows up every platform below
+    if game.frames % 45 == 0 and game.platforms:
+        game.sync()
+        plat = rnd.choice([plat for plat in game.platforms if not plat.dead])
+        for i in range(3):
+            tnt = game.TNTList.pool.make(plat, game)
+            tnt.rect.update(game.player.rect.move(0, -i * 10))    # moved in place, since the TNT list keeps the same rect
+            game.addObject(game.TNTList, tnt)
+
+
+def crowd(game, rnd):
+    # keeps CROWD platforms in the game by filling the CROWDHEIGHT pixels above the screen, so every frame scrolls, culls and moves well over a thousand objects
+    for i in range(100):    # tops up a hundred at a time, so filling it up doesn't all land on one frame
+        if len(game.platforms) >= CROWD:
+            break
+        game.genPlat(-CROWDHEIGHT, -20)
+
+
+CROWD = 1500
+CROWDHEIGHT = 40 * HEIGHT
+manyMoving = {"movingChance": 80, "breakChance": 10, "normalChance": 10}    # almost every platform moves
+
+
+# name: (difficulty, frames, changes to the difficulty's profile or None, something done every frame or None, description)
+scenarios = {
+    "climb": ("hard", 20000, None, None, "a long hard mode climb"),
+    "jetpack": ("normal", 10000, None, jetpackBursts, "the jetpack started every 4 seconds"),
+    "tnt": ("normal", 10000, None, tntChains, "stacks of TNT set off on the player every 45 frames"),
+    "moving": ("hard", 20000, manyMoving, None, "80% of platforms moving"),
+    "crowd": ("normal", 3000, {"reachable": 0}, crowd, f"{CROWD} platforms kept above the screen, where the NumPy backend pays off"),
+    "soak": ("normal", 30 * 60 * FPS, None, None, "30 minutes of normal mode, to show anything that keeps growing"),
+}
+
+
+def runScenario(name, scale = 1, arrays = False, draw = True, chunked = False):
+    '''
+    Plays one scenario and returns its results: the time of each part of a frame in milliseconds, and the number of each kind of object
+    '''
+    gameMode, frames, changes, everyFrame, description = scenarios[name]
+    frames = max(1, int(frames * scale))
+    rnd = rand.Random(SEED)
+    profile = None
+    if changes:
+        profile = profiles[gameMode].replace(**changes)
+
+    if arrays:
+        from EntityArrays import ArrayGameState
+        game = ArrayGameState(gameMode, SEED, chunked, profile)
+    else:
+        game = GameState(gameMode, SEED, chunked, profile)
+    if draw:
+        import Game    # loads the sprites and sets up the (off screen) display
+    times = PhaseTimes()
+    game.profiler = times
+    counts = [[] for lis in game.listList]
+
+    start = perf_counter()
+    for i in range(frames):
+        if everyFrame:
+            everyFrame(game, rnd)
+        game.step(climber(game, rnd))
+        if draw:
+            changed = Game.drawGame(game)    # reports its own parts (draw, hud, blit) to the profiler
+            flipStart = perf_counter_ns()
+            if changed is None:
+                display.flip()
+            else:
+                display.update(changed)
+            game.lap("flip", flipStart)
+        times.endFrame()
+
+        for j in range(len(game.listList)):
+            counts[j].append(len(game.listList[j]))
+        if game.over:
+            revive(game)
+    elapsed = perf_counter() - start
+    game.close()
+
+    results = {"description": description, "difficulty": gameMode, "frames": frames, "seconds": elapsed, "altitude": int(game.altitude), "phases": {}, "entities": {}}
+    for phase in times.times:
+        results["phases"][phase] = summarize(times.times[phase], 1e-6)
+    for j in range(len(LISTNAMES)):
+        tenth = max(1, frames // 10)
+        entities = summarize(counts[j])
+        entities["final"] = counts[j][-1]
+        entities["firstTenth"] = sum(counts[j][:tenth]) / tenth    # if the last tenth is much bigger than the first, something is building up
+        entities["lastTenth"] = sum(counts[j][-tenth:]) / tenth
+        results["entities"][LISTNAMES[j]] = entities
+    return results
+
+
+def gitCommit():
+    # the commit being benchmarked, if this is a git checkout
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output = True, text = True, check = True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def printResults(name, results):
+    print(f"{name}: {results['description']} - {results['frames']} frames in {results['seconds']:.1f}s")
+    print(f"    {'phase':10}" + "".join(f"{key:>9}" for key in ["p50", "p95", "p99", "max"]) + "  (ms)")
+    for phase in results["phases"]:
+        summary = results["phases"][phase]
+        print(f"    {phase:10}" + "".join(f"{summary[key]:9.3f}" for key in ["p50", "p95", "p99", "max"]))
+    for listName in results["entities"]:
+        entities = results["entities"][listName]
+        print(f"    {listName:10} max {entities['max']:5}  final {entities['final']:5}  first tenth {entities['firstTenth']:7.1f}  last tenth {entities['lastTenth']:7.1f}")
+
+
+def compare(oldFile, newFile):
+    '''
+    Prints how the times changed between two saved benchmarks, as a percentage of the old time (negative is faster)
+    '''
+    with open(oldFile) as f:
+        old = json.load(f)
+    with open(newFile) as f:
+        new = json.load(f)
+    print(f"{old.get('commit')} -> {new.get('commit')}")
+    for name in new["scenarios"]:
+        if name not in old["scenarios"]:
+            continue
+        print(name)
+        for phase in new["scenarios"][name]["phases"]:
+            if phase not in old["scenarios"][name]["phases"]:
+                continue
+            before = old["scenarios"][name]["phases"][phase]
+            after = new["scenarios"][name]["phases"][phase]
+            changes = []
+            for key in ["p50", "p95", "p99", "max"]:
+                if before[key] > 0:
+                    changes.append(f"{key} {(after[key] - before[key]) / before[key] * 100:+6.1f}%")
+                else:
+                    changes.append(f"{key}    n/a ")
+            print(f"    {phase:10}" + "  ".join(changes))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Times the game loop over scripted scenarios.")
+    parser.add_argument("scenarios", nargs = "*", help = "which scenarios to run: " + ", ".join(scenarios) + " (all of them by default)")
+    parser.add_argument("--scale", type = float, default = 1, help = "multiplies the number of frames in every scenario, e.g. 0.1 for a quick run")
+    parser.add_argument("--arrays", action = "store_true", help = "use the NumPy backend from EntityArrays.py")
+    parser.add_argument("--chunks", action = "store_true", help = "make the level ahead on a worker thread (Chunks.py)")
+    parser.add_argument("--no-draw", dest = "draw", action = "store_false", help = "only time the simulation")
+    parser.add_argument("--out", default = "benchmark.json", help = "where the JSON results are saved")
+    parser.add_argument("--compare", nargs = 2, metavar = ("OLD", "NEW"), help = "compare two saved results instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        sys.exit()
+
+    names = args.scenarios or list(scenarios)
+    for name in names:
+        if name not in scenarios:
+            parser.error(f"unknown scenario {name}")
+
+    report = {"commit": gitCommit(), "python": platform.python_version(), "pygame": version.ver, "machine": platform.platform(), "arrays": args.arrays,
+              "chunks": args.chunks, "draw": args.draw, "scale": args.scale, "seed": SEED, "scenarios": {}}
+    for name in names:
+        report["scenarios"][name] = runScenario(name, args.scale, args.arrays, args.draw, args.chunks)
+        printResults(name, report["scenarios"][name])
+
+    with open(args.out, "w") as outFile:
+        json.dump(report, outFile, indent = 2)
+    print(f"saved to {args.out}")
@@ -0,0 +1,153 @@
+# Chunks.py
+'''
+Generates the level ahead of the camera on a worker thread, so finding places for platforms never happens in the middle of a frame.
+The level above the starting screen is split into chunks CHUNKHEIGHT pixels tall. The worker lays out each chunk in turn (which kind of platform goes where, using the
+same placement as GameState.genPlat) and queues it; the game only takes finished chunks off the queue, and makes the platforms (with their tokens and obstacles) one
+at a time as each comes within SPAWNAHEAD pixels of the top of the screen, so no frame has to make a whole chunk.
+Every chunk has its own seed made from the game's seed and the chunk's number, so a chunk is always laid out the same way no matter when the worker gets to it, and
+a game with chunks can still be replayed exactly. Turned on with GameState(gameMode, seed, chunked = True).
+'''
+
+import queue
+from collections import deque
+import threading
+from time import sleep
+from Simulation import *
+
+CHUNKHEIGHT = 600
+CHUNKSAHEAD = 4    # how many finished chunks the worker keeps ready
+SPAWNAHEAD = 600    # how far above the top of the screen a chunk is put into the game
+CHUNKDENSITY = 1    # platforms per chunk compared to the normal rate of one every genSpeed frames at the starting scroll speed
+CLIMBLINKS = 6    # for reachable difficulties, the most platforms added to a chunk when its others don't make a way up to the top of it
+
+
+class Slot():
+    '''
+    Where one platform in a chunk goes and what kind it is, before the real Platform is made. The position is in world coordinates (from the bottom of the first chunk)
+    '''
+    __slots__ = ["rect", "mode", "length", "spriteType", "endX", "pathRect"]
+
+    def __init__(self, rect, mode, length, spriteType, endX = None):
+        self.rect = rect
+        self.mode = mode
+        self.length = length    # 0, 1 or 2, as passed to Platform
+        self.spriteType = spriteType
+        self.endX = endX
+        if mode == MOVE:
+            self.pathRect = Rect(rect[X], rect[Y], endX - rect[X] + rect[2], rect[3])
+
+
+class ChunkGenerator(Placement):
+    '''
+    Lays out the chunks of one game on a worker thread. The worker starts when the first chunk is taken, when the starting platforms are all in place
+    '''
+    def __init__(self, game):
+        self.game = game
+        self.threaded = True    # False lays each chunk out on the game's thread when it is taken, for headless runs where no frame is waiting to be drawn
+        self.seed = game.seed
+        self.next = 0    # the number of the next chunk to be taken
+        self.waiting = deque()    # slots from chunks that have been taken but aren't close enough to the screen yet, lowest first
+        self.queue = queue.Queue(CHUNKSAHEAD)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        # copies what the worker needs from the game, so the worker never touches the game itself
+        game = self.game
+        game.sync()    # the NumPy backend only moves the platforms' rects when asked to
+        self.profile = game.profile    # can't be changed, so the worker can share it
+        self.frontierTop = game.frontierTop    # the chunks carry on the way up from the highest platform that can be reached
+        self.perChunk = max(1, round(CHUNKHEIGHT / (game.genSpeed * game.startingScroll) * CHUNKDENSITY))
+
+        # the platforms already on the screen, so the first chunk doesn't crowd them
+        self.grid = PlatGrid()
+        startingSlots = []
+        for plat in game.platforms:
+            if not plat.dead:
+                if plat.mode == MOVE:
+                    slot = Slot(plat.rect.move(0, -game.grid.offset), MOVE, 0, plat.spriteType, plat.endPos[X])
+                    slot.pathRect = plat.pathRect.move(0, -game.grid.offset)    # the platform may already have moved along its path
+                else:
+                    slot = Slot(plat.rect.move(0, -game.grid.offset), plat.mode, 0, plat.spriteType)
+                self.grid.add(slot)
+                startingSlots.append(slot)
+        self.recent = [startingSlots]    # the slots of the last chunks, which the next chunk is checked against
+
+        if self.threaded:
+            self.thread = threading.Thread(target = self.run, name = "chunk generator", daemon = True)
+            self.thread.start()
+
+    def run(self):
+        number = 0
+        while not self.stopped.is_set():
+            try:
+                chunk = self.makeChunk(number)
+            except Exception as error:    # passed on to the game's thread to be raised there, instead of the game waiting forever for the chunk
+                chunk = error
+            while not self.stopped.is_set():    # waits for room in the queue, but gives up if the game has ended
+                try:
+                    self.queue.put(chunk, timeout = 0.2)
+                    break
+                except queue.Full:
+                    pass
+            if isinstance(chunk, Exception):
+                return
+            number += 1
+
+    def makeChunk(self, number):
+        '''
+        Lays out one chunk and returns its slots
+        '''
+        self.rng = Random(f"{self.seed}:{number}")    # the chunk's own seed
+        bottom = -number * CHUNKHEIGHT
+        slots = []
+        for i in range(self.perChunk + CLIMBLINKS):
+            climb = self.profile.reachable and self.bridging(bottom - CHUNKHEIGHT)    # for reachable difficulties the first platforms make a way up through the chunk
+            if i >= self.perChunk and not climb:    # the extra platforms are only for finishing the way up
+                break
+            rolled = self.rollPlatform(number * CHUNKHEIGHT)    # the height of the chunk stands in for the altitude when picking the theme
+            if rolled is None:
+                continue
+            mode, length, rectLength, spriteType = rolled
+            spot = self.findSpot(bottom - CHUNKHEIGHT, bottom - PLATWIDTH, rectLength, mode, climb)
+            if spot is None:
+                continue
+            x, y, endX = spot
+            slot = Slot(Rect(x, y, rectLength, PLATWIDTH), mode, length, spriteType, endX)
+            self.grid.add(slot)
+            slots.append(slot)
+            if self.threaded:
+                sleep(0)    # lets the game thread have the GIL between platforms, so it never waits for a whole chunk
+
+        # only the chunk right below can be close enough to matter for the next one
+        self.recent.append(slots)
+        if len(self.recent) > 2:
+            for slot in self.recent.pop(0):
+                self.grid.remove(slot)
+        slots.sort(key = lambda slot: slot.rect[Y], reverse = True)
+        return slots
+
+    def arrived(self, offset):
+        '''
+        Returns the slots that have come within SPAWNAHEAD of the top of the screen, when the screen has scrolled "offset" in total.
+        Chunks are taken from the worker as their bottoms get that close, waiting for it if it isn't done yet
+        '''
+        while -self.next * CHUNKHEIGHT + offset >= -SPAWNAHEAD:
+            if self.next == 0:
+                self.start()
+            if self.threaded:
+                chunk = self.queue.get()
+                if isinstance(chunk, Exception):    # the worker failed
+                    raise chunk
+                self.waiting.extend(chunk)
+            else:
+                self.waiting.extend(self.makeChunk(self.next))
+            self.next += 1
+
+        slots = []
+        while self.waiting and self.waiting[0].rect[Y] + offset >= -SPAWNAHEAD:
+            slots.append(self.waiting.popleft())
+        return slots
+
+    def stop(self):
+        self.stopped.set()
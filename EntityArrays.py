@@ -0,0 +1,281 @@
+# EntityArrays.py
+'''
+An optional backend for the simulation that keeps the geometry of every platform, token, obstacle and TNT in NumPy arrays (one array per field: x, y, w, h, mode,
+length, theme, flags, ...) instead of only in each object's Rect. Scrolling, removing things that went off the screen, moving the moving platforms and checking what
+the player is touching each become one array operation per frame, so the time a frame takes hardly grows with the number of objects.
+Every array operation has a fixed cost though, so this is only worth using for games with well over a thousand objects. In Benchmark.py's "crowd" scenario (about
+1900 objects) the middle frame takes about a third of the time it does with the lists, but with the usual 10 to 30 objects a frame takes several times longer
+(about 0.23 ms against 0.04 ms in the "climb" scenario), so the game itself uses the lists.
+The objects are still kept in the normal lists; their rects are only written back from the arrays when something needs them (drawing, placing platforms, explosions).
+Positions are truncated the same way a Rect truncates them, so a game plays out exactly the same with either backend.
+NumPy is only needed if this backend is used:
+    python Simulation.py hard 100000 arrays
+'''
+
+try:
+    import numpy as np
+except ImportError:    # the game works without NumPy, just not with this backend
+    np = None
+
+from Simulation import *
+
+# which list an object is in, in the same order as listList
+PLATKIND = 0
+TNTKIND = 1
+TOKENKIND = 2
+OBSKIND = 3
+
+# bits in the flags array
+ALIVE = 1
+RIGHT = 2    # moving platform is moving right
+ALLFLAGS = 255
+
+COLUMNS = {"x": "float64", "y": "float64", "w": "float64", "h": "float64", "kind": "int8", "mode": "int8", "length": "int16", "theme": "int8", "flags": "uint8",
+           "startX": "float64", "endX": "float64", "pathY": "float64", "parent": "int64"}
+
+
+class EntityArrays():
+    '''
+    The arrays for all the objects in a game. Each object has a row, which is stored on it as obj.row, and objects[row] goes back the other way.
+    Removed objects only have their ALIVE flag cleared; the dead rows are packed away by compact() once they are at least half of the rows
+    '''
+    def __init__(self, capacity = 256):
+        self.count = 0    # the number of rows in use, including dead ones
+        self.deadCount = 0
+        self.objects = []    # the object for each row
+        self.dirty = False    # whether the arrays have moved things since the rects were last written back
+        for name in COLUMNS:
+            setattr(self, name, np.zeros(capacity, COLUMNS[name]))
+
+    def grow(self):
+        # doubles the number of rows that can be stored
+        for name in COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(len(old) * 2, COLUMNS[name])
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, obj, kind):
+        '''
+        Gives an object a row and copies its rect (and for platforms, how it moves) into the arrays
+        '''
+        if self.count == len(self.x):
+            self.grow()
+        row = self.count
+
+        self.x[row] = obj.rect[X]
+        self.y[row] = obj.rect[Y]
+        self.w[row] = obj.rect[2]
+        self.h[row] = obj.rect[3]
+        self.kind[row] = kind
+        self.flags[row] = ALIVE
+        self.parent[row] = -1
+
+        if kind == PLATKIND:
+            self.mode[row] = obj.mode
+            self.length[row] = obj.length
+            if obj.spriteType == "space":
+                self.theme[row] = 1
+            else:
+                self.theme[row] = 0
+            if obj.mode == MOVE:
+                self.startX[row] = obj.startPos[X]
+                self.endX[row] = obj.endPos[X]
+                self.pathY[row] = obj.pathRect[Y]
+                if obj.dir == "R":
+                    self.flags[row] |= RIGHT
+        else:
+            if kind == TNTKIND:
+                self.mode[row] = 0
+            else:
+                self.mode[row] = obj.mode
+            self.parent[row] = obj.plat.row    # the platform that the object is on
+
+        obj.row = row
+        self.objects.append(obj)
+        self.count += 1
+
+    def kill(self, obj):
+        if self.flags[obj.row] & ALIVE:
+            self.flags[obj.row] &= ALLFLAGS ^ ALIVE
+            self.deadCount += 1
+
+    def alive(self):
+        return (self.flags[:self.count] & ALIVE) != 0
+
+    def scroll(self, distance):
+        # moves everything down, truncating like a Rect does
+        n = self.count
+        self.y[:n] = np.trunc(self.y[:n] + distance)
+        self.dirty = True
+
+    def cull(self, limit):
+        # returns the objects that are further down the screen than "limit"
+        rows = np.nonzero(self.alive() & (self.y[:self.count] > limit))[0]
+        return [self.objects[row] for row in rows.tolist()]
+
+    def movePlatforms(self):
+        '''
+        Moves every moving platform 2 pixels along its path and turns it around at the ends, the same as Platform.moveMode() and pathUpdate()
+        '''
+        n = self.count
+        rows = np.nonzero(self.alive() & (self.kind[:n] == PLATKIND) & (self.mode[:n] == MOVE))[0]
+        if len(rows) == 0:
+            return
+
+        right = (self.flags[rows] & RIGHT) != 0
+        x = self.x[rows] + np.where(right, 2, -2)
+        right = np.where(x >= self.endX[rows], False, right)    # switches directions
+        right = np.where(x <= self.startX[rows], True, right)
+
+        self.x[rows] = x
+        self.flags[rows] = (self.flags[rows] & (ALLFLAGS ^ RIGHT)) | np.where(right, RIGHT, 0).astype("uint8")
+        self.pathY[rows] = self.y[rows]
+        self.dirty = True
+
+    def overlaps(self, rect, kind):
+        '''
+        Returns the live objects of one kind whose rects overlap "rect" (the same test as Rect.colliderect), with their rects written back
+        '''
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        hit = self.alive() & (self.kind[:n] == kind) & (x < rect.right) & (x + self.w[:n] > rect.left) & (y < rect.bottom) & (y + self.h[:n] > rect.top)
+        rows = np.nonzero(hit)[0].tolist()
+        self.writeBack(rows)
+        return [self.objects[row] for row in rows]
+
+    def orphans(self):
+        # returns the live obstacles whose platform has been removed
+        n = self.count
+        alive = self.alive()
+        parent = self.parent[:n]
+        parentAlive = np.where(parent >= 0, alive[np.maximum(parent, 0)], False)
+        rows = np.nonzero(alive & (self.kind[:n] == OBSKIND) & ~parentAlive)[0]
+        return [self.objects[row] for row in rows.tolist()]
+
+    def writeBack(self, rows):
+        # copies the positions in the arrays back into the objects' rects
+        xs = self.x[rows].tolist()
+        ys = self.y[rows].tolist()
+        flags = self.flags[rows].tolist()
+        pathYs = self.pathY[rows].tolist()
+        for i in range(len(rows)):
+            obj = self.objects[rows[i]]
+            obj.rect[X] = xs[i]
+            obj.rect[Y] = ys[i]
+            if self.kind[rows[i]] == PLATKIND and obj.mode == MOVE:
+                obj.pathRect[Y] = pathYs[i]
+                if flags[i] & RIGHT:
+                    obj.dir = "R"
+                else:
+                    obj.dir = "L"
+
+    def sync(self):
+        # writes back every live object, only if something has moved since the last time
+        if self.dirty:
+            self.writeBack(np.nonzero(self.alive())[0].tolist())
+            self.dirty = False
+
+    def compact(self):
+        '''
+        Packs the live rows together once at least half of the rows are dead, keeping them in the same order
+        '''
+        if self.deadCount * 2 < self.count or self.count < 64:
+            return
+
+        n = self.count
+        keep = self.alive()
+        newRow = np.cumsum(keep) - 1    # the row each live row moves to
+        parent = self.parent[:n]
+        parentKept = np.where(parent >= 0, keep[np.maximum(parent, 0)], False)
+        self.parent[:n] = np.where(parentKept, newRow[np.maximum(parent, 0)], -1)
+
+        for name in COLUMNS:
+            column = getattr(self, name)
+            live = column[:n][keep]
+            column[:len(live)] = live
+
+        self.objects = [obj for obj, k in zip(self.objects, keep.tolist()) if k]
+        for row in range(len(self.objects)):
+            self.objects[row].row = row
+        self.count = len(self.objects)
+        self.deadCount = 0
+
+
+class ArrayGameState(GameState):
+    '''
+    A GameState that uses EntityArrays for the parts of a frame that go over every object. Everything else is the same as in GameState
+    '''
+    def __init__(self, gameMode, seed = None, chunked = False, profile = None):
+        if np is None:
+            raise ImportError("the array backend needs NumPy")
+        self.arrays = EntityArrays()
+        self.breaking = []    # breakable platforms whose timers are counting down
+        self.broken = []    # breakable platforms that broke this frame and are removed next frame
+        GameState.__init__(self, gameMode, seed, chunked, profile)
+
+        for lis in self.listList:
+            lis.onKill = self.arrays.kill
+
+    def kindOf(self, objects):
+        for kind in range(len(self.listList)):
+            if self.listList[kind] is objects:
+                return kind
+
+    def addObject(self, objects, obj):
+        objects.append(obj)
+        self.arrays.add(obj, self.kindOf(objects))
+
+    def scrollAll(self, distance):
+        self.arrays.scroll(distance)
+        self.grid.scroll(distance)
+
+    def cullAll(self):
+        for obj in self.arrays.cull(HEIGHT + 500):
+            self.listList[self.arrays.kind[obj.row]].kill(obj)
+            self.grid.remove(obj)
+
+    def nearPlayer(self, objects):
+        return self.arrays.overlaps(self.player.rect, self.kindOf(objects))
+
+    def sync(self):
+        self.arrays.sync()
+
+    def genPlat(self, range1, range2, climb = False):
+        self.sync()    # the new platform is checked against the rects of the platforms near it
+        GameState.genPlat(self, range1, range2, climb)
+
+    def updatePlatforms(self):
+        '''
+        Only the breakable platforms under the player and the ones already breaking are looked at, the moving ones are all moved at once
+        '''
+        player = self.player
+        if player.collision:
+            touching = player.rect.copy()
+            touching[Y] += 1
+            for plat in self.arrays.overlaps(touching, PLATKIND):
+                if plat.mode == BREAK and plat.visible and not plat.setTimer:
+                    plat.setTimer = True
+                    self.breaking.append(plat)
+
+        for plat in self.breaking:
+            plat.timer -= 1
+            if plat.timer == 0:
+                plat.visible = False
+                self.broken.append(plat)
+        self.breaking = [plat for plat in self.breaking if plat.visible and not plat.dead]
+
+        self.arrays.movePlatforms()
+
+    def breakPlat(self):
+        for plat in self.broken:
+            self.removePlat(plat)
+        self.broken = []
+
+        for obst in self.arrays.orphans():
+            self.obsList.kill(obst)
+
+    def step(self, inputs):
+        GameState.step(self, inputs)
+        self.arrays.compact()
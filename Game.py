@@ -13,745 +13,250 @@ There is a start menu that leads to a menu for the instructions and to a screen
 from pygame import *
 from math import *
 from random import *
+import sys
+from Simulation import *    # the game objects and the GameState that runs the gameplay
+from TextCache import *
+from Assets import *
+from Profiler import FrameProfiler
+from HighScores import HighScoreStore
+from Autopilot import Autopilot
 
 font.init()
 
-vec = math.Vector2
 myClock = time.Clock()
 
-# setting constants
-GREEN = (0, 255, 0)
-RED = (255, 0, 0)
-
-WIDTH = 600    # width and height of screen
-HEIGHT = 700
-PLATWIDTH = 20    # thickness of platforms
-FPS = 60
-
-MAXDIST = 300
-MINPLATMOVE = 80    # minimum range that a moving platform can move around in
-
-# constants to make it easier to keep track of types of things
-NORMAL = 0
-BREAK = 1
-MOVE = 2
-
-JUMP = 0
-STAR = 1
-JETPACK = 2
-
-SPIKE = 0
-LASER = 1
-
-X = 0
-Y = 1
-
-maxDist = 200
-minDist = 100    # minimum distance that can be present between platforms
-
 screen = display.set_mode((WIDTH, HEIGHT))
 
 
 fnt = font.SysFont("Consolas", 50)
 starFnt = font.SysFont("Consolas", 30, bold = True)
 
+# the characters of the score and star counter, rendered once
+scoreGlyphs = GlyphText(fnt, (255, 255, 255))
+starGlyphs = GlyphText(starFnt, (255, 255, 0), DIGITS + "/")
+
 # loading images and converting them to run smoother
 
-menus = ["main", "instruction", "difficulty", "gameover"]    # image of menus, which will evetually have buttons to be able to interact with them
+# the menus (which will evetually have buttons to be able to interact with them) and the backgrounds for in the game come from the image cache
+images = loadImages()
 loadedMenu = []   # list for loaded images
-playerSprite = [image.load("playerRight.png").convert_alpha(), image.load("playerLeft.png").convert_alpha()]
-backgrounds = ["star", "sky", "skydark", "starlight"]    # backgrounds for in the game
-
-# loading sprites for things that can be interacted with in-game
 loadedBack = []
-platSprites = ["shortgrass", "medgrass", "longgrass", "shortspace", "medspace", "longspace", "shortspacebreak", "medspacebreak", "longspacebreak", "shortgrassbreak", "medgrassbreak", "longgrassbreak"]
+
+# sprites for things that can be interacted with in-game all come from one atlas (the lists of their names are in Assets.py)
+sprites = loadSprites()
+playerSprite = [sprites["playerRight.png"], sprites["playerLeft.png"]]
 loadedPlat = []
-toks = ["jetpack", "jump", "star", "tnt"]
 loadedToks = []
-obsSprites = ["laser", "spikeShort", "spikeMed", "spikeLong", "laserEnd"]
 loadedObs = []
-
-# icons that keep track of lives and extra jumps
-icons = ["jumpFilled", "jumpEmpty", "heartFilled", "heartEmpty"]
 loadedIcons = []
 
 # for loops for loading and appending to lists
 for m in menus:
-    loadedMenu.append(image.load(m + "Menu.png").convert_alpha())
+    loadedMenu.append(images[m + "Menu.png"])
 
 for back in backgrounds:
-    loadedBack.append(image.load(back + "Back.png").convert_alpha())
+    loadedBack.append(images[back + "Back.png"])
 
 for sprite in platSprites:
-    loadedPlat.append(image.load(sprite + "Plat.png").convert_alpha())
+    loadedPlat.append(sprites[sprite + "Plat.png"])
 
 for t in toks:
-    loadedToks.append(image.load(t + "Tok.png").convert_alpha())
+    loadedToks.append(sprites[t + "Tok.png"])
 
 for o in obsSprites:
-    loadedObs.append(image.load(o + ".png").convert_alpha())
+    loadedObs.append(sprites[o + ".png"])
 
 for i in icons:
-    loadedIcons.append(image.load(i + ".png").convert_alpha())
+    loadedIcons.append(sprites[i + ".png"])
 
+for kind in archetypes.values():    # every platform archetype gets its sprite, so drawing a platform is a single lookup
+    kind.image = loadedPlat[kind.sprite]
 
-# classes
-class Player():
-    '''
-    Stores all the information about the player that the user controls. Also has the functions that directly affect the player: moving/updating the player's position, jumping, canceling jumps, jetpacking, and invincibility frames
-    '''
-    def __init__(self, pos, rect):
-        # initializes variables
-        self.pos = pos
-        self.vel = vec(0, 0)    # player's velocity
-        self.acc = vec(0, 0)    # player's acceleration
-        self.rect = rect
-        self.facing = "R"
-        self.sprite = playerSprite[0]
-        self.invincible = False    # controls if the player is affected by obstacles, activates if the player is hit
-        self.invincibleTime = 1 * FPS    # the amount of time that the player is invincible for
-        self.jumping = False    # whether the player is jumping or not
-        self.maxSpeed = 10    # speed of player's horizontal movement
-        self.collision = False
-        self.available = 1    # whether the player has already double jumped or not in a jump
-        self.jetpack = False    # whether or not the player is in the jetpack state
-        self.jetpackTime = randint(2, 3) * FPS    # the amount of time the player has in the jetpack state
 
-        
-    def move(self):
-        '''
-        Changes the player's position based on the preset gravity and the user's inputs
-        Referenced from https://coderslegacy.com/python/pygame-gravity-and-jumping/
-        '''
-        
-        self.acc = vec(0, 0.9)    # 0.9 creates gravity by constantly increasing the player's downward velocity
-        self.vel.x = 0    # resets the player's horizontal velocity to 0 so that the player can stop after moving
+# functions
 
-        keys = key.get_pressed()
-        
-        # changes the player's horizontal velocity
-        if keys[K_LEFT]:
-            self.vel.x = -self.maxSpeed    
-            self.facing = "L"    # the direction that the player is facing, used to draw the player sprite in the corresponding direction
-        elif keys[K_RIGHT]:
-            self.vel.x = self.maxSpeed
-            self.facing = "R"
-
-        # updating the player's position based  on the current speed
-        self.vel = self.vel + self.acc
-        self.pos[1] += self.vel.y
-        self.pos[0] += self.vel.x
-        self.rect[0] = self.pos[0]
-        self.rect[1] = self.pos[1]    # updates the player's rect to match the position
-
-        # teleports the player to the other side of the screen if they go off from the side
-        if self.rect.left >= WIDTH:
-            self.pos[X] = -40
-        if self.rect.right <= 0:
-            self.pos[X] = WIDTH
-
-    def playerJump(self):
-        '''
-        Makes the player jump or double jump when called
-        '''
-
-        global jumps
-        self.jumping = True
-        if self.vel.y != 0:    # if the player is currently in the air
-            if jumps > 0:
-                if self.available:    # if the player has not already double jumped
-                    jumps -= 1
-                    self.available = 0
-                    self.vel.y = -24
-
-        if self.vel.y == 0:
-            self.vel.y = -24    # increases the upward velocity, resulting in a jump
-
-    def jumpCancel(self):
-        '''
-        Cancels a jump early if the spacebar is released
-        '''
-        
-        if self.jumping:
-            if self.vel.y < -10:
-                self.vel.y = -10
-            
-    def spriteChange(self):
-        '''
-        Changes the player's sprite based on the way it is facing
-        '''
-        
-        if self.facing == "R":
-            self.sprite = playerSprite[0]
-        if self.facing == "L":
-            self.sprite = playerSprite[1]
-        
+def laserColumn(width):
+    # Returns a red column that lasers of this width are drawn from, so that they can be drawn in the same batch as the sprites
+    if width not in laserColumns:
+        laserColumns[width] = Surface((width, 500)).convert()    # 500 is the longest that a laser can be
+        laserColumns[width].fill((255, 0, 0))
+    return laserColumns[width]
 
-    
-    def collide(self, plats):
-        '''
-        Controls what happens when a player collides with a platform
-        '''
 
-        
-        self.collision = False
-        for plat in plats:
-            if plat.rect.colliderect(self.rect):
-                if self.vel.y > 0:
-                    if (self.rect.bottom >= plat.rect.top and self.rect.bottom < plat.rect.bottom) and self.rect.top < plat.rect.top:    # makes sure that the player only gets placed on top of the platform if it is entirely above the platform
-                        self.jumping = False
-                        self.collision = True
-                        self.vel.y = 0
-                        self.acc.y = 0    # gravity stops when the player is on a platform
-                        self.pos[Y] = plat.rect.top - self.rect[3] + 1    # places the player on the top of the platform so that they are not stuck in the platform
-                        self.available = 1    # the double jump is refreshed
-
-                        # makes the player move with a moving platform
-                        if plat.mode == MOVE:
-                            if plat.dir == "R":
-                                self.pos[X] += 2
-                            if plat.dir == "L":
-                                self.pos[X] -= 2
-
-    def jetpacking(self):
-        '''
-        Contols the player's movement when in the jetpacking state
-        '''
-        
-        global scrollSpeed
-        if self.jetpackTime > 0:
-            self.jetpackTime -= 1
-            self.vel.y = -20
-            self.acc.y = 0
-            scrollSpeed = -self.vel.y    # increases the scroll speed to that the screen follows the player
-
-            # gradually draws more platforms as the jetpacking state ends so that the player has platforms to stand on
-            if self.jetpackTime == 25:    # 25 frames left
-                for i in range(3):
-                    genPlat(-100, -20)
-            if self.jetpackTime == 15:    # 15 frames left
-                for i in range(3):
-                    genPlat(-100, -20)
-            if self.jetpackTime == 10:    # 10 frames left
-                for i in range(5):
-                    genPlat(-300, -20)
-                    
-            if self.jetpackTime == 0:    # jetpack state ends
-                self.jetpack = False
-                self.jetpackTime = randint(2, 3) * FPS    # resets the jetpack time
-                scrollSpeed = startingScroll
-
-    def invincibility(self):
-        '''
-        Makes the player uninvincible after some time so that the player has i-frames after touching an obstacle
-        '''
-        
-        if self.invincible == True:
-            if self.invincibleTime > 0:
-                self.invincibleTime -= 1    # time starts counting down when invincibile is first set to true
-
-                if self.invincibleTime == 0:    # i-frames end
-                    self.invincible = False
-                    self.invincibleTime = 1 * FPS    # resets invincibility time
-            
-        
-        
-        
-class Platform():
+def drawGame(game, alpha = 1):
     '''
-    Contains the information about a platform: the type/mode, position, rect, sprite, objects on it, etc.
+    Draws the current frame of a game: background, player, obstacles, tokens, platforms, TNT and the HUD.
+    "alpha" is how far the drawing is between the last simulation step (0) and the current one (1), so that the screen moves smoothly when it is drawn more often than the game is stepped.
+    Everything is put in a list in the order it is drawn and drawn with a single screen.blits() call.
+    Returns the parts of the screen that changed when dirty rects are on, or None if the whole screen should be flipped
     '''
-    def __init__(self, rect, mode, length, spriteType):
-        # initialize variables
-        self.rect = rect
-        self.pos = [self.rect[0], self.rect[1]]
-        self.mode = mode    # the type of platform: normal, breakable, or moving
-        self.spriteType = spriteType    # which theme the sprite will be: "grass" - grassy or "space" - futuristic
-
-        # sets which of three lengths of platform this one will be
-        if length == 0:
-            self.length = 40
-        if length == 1:
-            self.length = 50
-        if length == 2:
-            self.length = 70
-
-        # sets what the platform's sprite will be
-        if self.length == 40:
-            if self.spriteType == "grass":    # grassy platforms
-                if self.mode == BREAK:
-                    self.sprite = loadedPlat[9]
-                else:
-                    self.sprite = loadedPlat[0]
-            if self.spriteType == "space":    # futuristic platforms
-                if self.mode == BREAK:
-                    self.sprite = loadedPlat[6]
-                else:
-                    self.sprite = loadedPlat[3]
-                
-        if self.length == 50:
-            if self.spriteType == "grass":
-                if self.mode == BREAK:
-                    self.sprite = loadedPlat[10]
-                else:
-                    self.sprite = loadedPlat[1]
-            if self.spriteType == "space":
-                if self.mode == BREAK:
-                    self.sprite = loadedPlat[7]
-                else:
-                    self.sprite = loadedPlat[4]
-
-        if self.length == 70:
-            if self.spriteType == "grass":
-                if self.mode == BREAK:
-                    self.sprite = loadedPlat[11]
-                else:
-                    self.sprite = loadedPlat[2]
-                
-            if self.spriteType == "space":
-                if self.mode == BREAK:
-                    self.sprite = loadedPlat[8]
-                else:
-                    self.sprite = loadedPlat[5]
-
-        # whether this platform will have any extra objects on it and what kind they will be
-        self.attribute = "none"
-        self.obstacle = "none"
-
-        # if the extra platforms objects have been drawn on already, otherwise will draw them multiple times
-        self.drawnAtt = False    
-        self.drawnObs = False
-
-        if self.mode != MOVE:   # so that moving platforms will not have objects or obstacles on it
-            chance = randint(1, 101)
-            if chance <= spikeChance:
-                self.obstacle = "spike"
-            elif chance <= spikeChance + laserChance:
-                self.obstacle = "laser"
-        if self.mode != MOVE:
-            chance = randint(1, 101)
-            if  chance <= TNTChance:
-                self.attribute = "TNT"
-            elif chance <= TNTChance + jumpChance:
-                self.attribute = "jump"
-            elif chance <= TNTChance + jumpChance + starChance:
-                self.attribute = "star"
-            elif chance <= TNTChance + jumpChance + starChance + jetpackChance:
-                self.attribute = "jetpack"
-
-        # set some attributes based on the platform's type
-        if self.mode == NORMAL:
-            self.colour = GREEN
-        if self.mode == BREAK:
-            self.colour = RED
-            self.visible = True   # whether the platform has been broken or not
-            self.timer = 10
-            self.setTimer = False    # sets a timer for the platform to disappear after the player goes on it
-        if self.mode == MOVE:
-            self.valid = True    # if the platform is one that can exist
-            self.colour = (0, 255, 255)
-            self.startPos = (self.pos[X], self.pos[Y])    # the position that the platform starts in
-                    
-            if self.pos[X] + MINPLATMOVE < WIDTH - self.rect[2]:
-                self.endPos = (randint(self.pos[X] + MINPLATMOVE, WIDTH - self.rect[2]), self.pos[Y])    # the point at which the platform switches directions - "WIDTH - self.rect[2]" guarantees that it will be on the screen 
-                self.pathRect = Rect(self.startPos[X], self.startPos[Y], self.endPos[X] - self.startPos[X] + self.rect[2], self.rect[3])    # a Rect that represents the path that the platform will take - all possible positions of the platform
+    global lastGame, lastBackground, lastDrawn
+    start = perf_counter_ns()    # the parts of drawing are timed for the profiler
+    player = game.player
+    game.sync()    # makes sure every rect is where it should be drawn
+
+    # sets the changing background based on altitude
+    background = loadedBack[1]    # starting background
+    if game.altitude >= 10000:
+        background = loadedBack[2]
+    if game.altitude >= 14000:
+        background = loadedBack[3]
+    if game.altitude >= 15000:
+        background = loadedBack[0]
+
+    batch = []    # (sprite, position) or (sprite, position, area) for everything that is drawn, in order
+
+    # how far back towards the last step things are drawn
+    back = 1 - alpha
+    shift = back * game.lastScroll    # everything other than the player only moves by scrolling (and moving platforms by 2 pixels)
+    playerX = player.rect[X] - back * (player.pos[X] - game.lastPlayerPos[X])
+    playerY = player.rect[Y] - back * (player.pos[Y] - game.lastPlayerPos[Y])
+    if abs(player.pos[X] - game.lastPlayerPos[X]) > WIDTH/2:    # the player went off the side and came out of the other one
+        playerX = player.rect[X]
+
+    # draws the player in the direction it is facing
+    if player.facing == "R":
+        batch.append((playerSprite[0], (playerX, playerY)))
+    if player.facing == "L":
+        batch.append((playerSprite[1], (playerX, playerY)))
+
+    # drawing obstacles and tokens
+    for obst in game.obsList:
+        if obst.mode == SPIKE:
+            batch.append((loadedObs[obst.sprite], (obst.rect[X], obst.rect[Y] - shift)))
+        if obst.mode == LASER:
+            obst.laserUpdate()
+            batch.append((laserColumn(obst.rect[2]), (obst.rect[X], obst.rect[Y] - shift), (0, 0, obst.rect[2], obst.rect[3])))
+            batch.append((loadedObs[4], (obst.topSpriteRect[X], obst.topSpriteRect[Y] - shift)))
+            batch.append((loadedObs[0], (obst.bottomSpriteRect[X], obst.bottomSpriteRect[Y] - shift)))
+
+    for tok in game.tokenList:
+        if tok.mode == JUMP:
+            batch.append((loadedToks[1], (tok.rect[X], tok.rect[Y] - shift)))
+        if tok.mode == STAR:
+            batch.append((loadedToks[2], (tok.rect[X], tok.rect[Y] - shift)))
+        if tok.mode == JETPACK:
+            batch.append((loadedToks[0], (tok.rect[X], tok.rect[Y] - shift)))
+
+
+    for plat in game.platforms:
+        if plat.mode == BREAK and not plat.visible:    # broken platforms aren't drawn
+            continue
+        platX = plat.rect[X]
+        if plat.mode == MOVE:    # moving platforms are drawn back along their path
+            if plat.dir == "R":
+                platX -= back * 2
             else:
-                self.valid = False
-                
-            self.dir = "R"    # current moving direction of the platform
-            
-
-    def breakMode(self, player):
-        '''
-        Controls the breaking of breakable platforms
-        '''
-        
-        if self.visible:
-            nonCorrected = player.rect    # the position of the player when colliding with a platform, before it is placed on top of the plaforms
-            nonCorrected[Y] += 1
-            if player.collision and nonCorrected.colliderect(self.rect):
-                self.setTimer = True
-
-            if self.setTimer:
-                self.timer -= 1
-            if self.timer == 0:
-                self.visible = False
-
-    def moveMode(self):
-        '''
-        Controls the movement of moving platforms
-        '''
-        
-        if self.dir == "R":
-            self.rect[X] += 2
-            self.pos[X] = self.pos[X] + 2
-        if self.dir == "L":
-            self.rect[X] -= 2
-            self.pos[X] = self.pos[X] - 2
-        # switches directions
-        if self.rect[X] >= self.endPos[X]:
-            self.dir = "L"
-        if self.rect[X] <= self.startPos[X]:
-            self.dir = "R"
-
-    def pathUpdate(self):
-        # updates the position of the path rect based on the current position of the plaform
-        self.pathRect[1] = self.rect[1]
-            
-
-
-class TNT():
-    '''
-    Contains all the information about a TNT: the platform it is on, its position/rect, sprite, etc.
-    Has function explode()
-    '''
-    def __init__(self, plat):
-        self.plat = plat
-        if self.plat.obstacle == "spike":    # raises TNT placement to not overlap with spikes
-            self.pos = (randint(plat.rect.left, plat.rect.right - 20), plat.rect.top - 40 - spikeHeight - 10)
-        else:
-            self.pos = (randint(plat.rect.left, plat.rect.right - 20), plat.rect.top - 40)
-        self.rect = Rect(self.pos[0], self.pos[1], 30, 40)
-        self.sprite = loadedToks[3]
-        self.exploded = False    # whether the TNT has been collided with yet
-
-    def explode(self):
-        '''
-        Deletes the TNT and platforms below it when colliding with it and launches th player
-        '''
-        global platforms
-        global TNTList
-        
-        killList = []
-        if player.rect.colliderect(self.rect):
-            self.exploded = True
-            player.TNTed = True
-            player.jumping = False
-            for i in range(len(platforms)):
-                if platforms[i].rect[1] >= self.rect.bottom:    # adds the index of platforms below the TNT to the list of platforms to be removed
-                    killList.append(i)
+                platX += back * 2
+        kind = plat.archetype    # the sprite, and how far up it is drawn so the player can stand on the surface of the sprite
+        batch.append((kind.image, (platX, plat.rect[Y] + kind.drawOffset - shift)))
 
-            player.vel.y = -40    # increases the upwards velocity of the player by a large amount
 
-        platforms = kill(platforms, killList)
+    # drawing TNT
+    for tnt in game.TNTList:
+        batch.append((loadedToks[3], (tnt.rect[X], tnt.rect[Y] - shift)))
 
-class Token():
-    '''
-    Contains information about a token object: the platform its on, the kind of token it is, etc.
-    '''
-    
-    def __init__(self, plat, mode):
-        size = 30
-        self.plat = plat
-        if self.plat.obstacle == "none" or self.plat.obstacle == "laser":
-            self.pos = (self.plat.rect[0] + self.plat.rect[3]/2, self.plat.rect.top - size - 10)
-            self.rect = Rect(self.pos[X], self.pos[Y], size, size)
-        if self.plat.obstacle == "spike":    # raises token placement to not overlap with spikes
-            self.pos = (self.plat.rect[0] + self.plat.rect[3]/2, self.plat.rect.top - size - spikeHeight - 10)
-            self.rect = Rect(self.pos[X], self.pos[Y], size, size)
-            
-        self.mode = mode
-            
-        self.gone = False    # sets to true when the token is collided with - it is consumed
-
-        if self.mode == JUMP:
-            self.colour = (255, 255, 255)
-            self.sprite = loadedToks[1]
-        if self.mode == STAR:
-            self.colour = (255, 255, 0)
-            self.sprite = loadedToks[2]
-        if self.mode == JETPACK:
-            self.colour = (0, 0, 255)
-            self.sprite = loadedToks[0]
-
-    # following functions perform similar functions: setting the token to "gone" and triggering the respective events when collided with
-    def doubJumpTok(self):
-        # double jump token
-        global jumps
-        if player.rect.colliderect(self.rect):
-            if jumps < 3:
-                jumps += 1
-            self.gone = True
-
-    def starTok(self):
-        global stars
-        if player.rect.colliderect(self.rect):
-            print("collide")
-            if stars < 8:
-                stars += 1
-            self.gone = True
-
-    def jetpackTok(self):
-        if player.rect.colliderect(self.rect):
-            player.jetpack = True    # starts the jetpack state
-            self.gone = True
-
-
-class Obs():
-    '''
-    Contains information about obstacles: the platform it is on, the type of obstacle, sprite, etc.
-    '''
-    
-    def __init__(self, plat, mode):
-        self.plat = plat
-        self.mode = mode
-
-        if self.mode == SPIKE:
-            self.rect = Rect(self.plat.rect[X], self.plat.rect[Y] - spikeHeight, self.plat.length, spikeHeight)    # length of spikes depends on length of platform
-            self.colour = (128, 128, 0)
-
-            # sprite of spike based on platform length
-            if plat.length == 40:
-                self.sprite = loadedObs[1]
-            if plat.length == 50:
-                self.sprite = loadedObs[2]
-            if plat.length == 70:
-                self.sprite = loadedObs[3]
-
-
-        if self.mode == LASER:
-            self.endPoint = randint(100, 500)    # random point for the laser to end
-            self.rect = Rect(self.plat.rect.center[X], self.plat.rect.top - self.endPoint, laserWidth, self.endPoint)    
-            self.colour = (255, 0, 0)
-            self.topSprite = loadedObs[4]    # sprites for the top and bottom of the lasers
-            self.bottomSprite = loadedObs[0]
-            self.topSpriteRect = Rect(self.rect[0] - self.topSprite.get_width()/2 + 5, self.rect.top - 4, self.topSprite.get_width(), self.topSprite.get_height())
-            self.bottomSpriteRect = Rect(self.rect[0] - self.topSprite.get_width()/2 + 5, self.rect.bottom - self.topSprite.get_height(), self.topSprite.get_width(), self.topSprite.get_height())
-    
-    def obsCollide(self):
-        '''
-        Reduce the lives by one when the player collides with an obstacle
-        '''
-        global lives
-        if player.rect.colliderect(self.rect) and player.invincible == False:    # only triggers if player is not invicible
-            screen.fill((255, 0, 0))
-            if lives > 0:
-                lives -= 1
-            player.invincible = True    # invincible state begins
+    start = game.lap("draw", start)
 
-    def laserUpdate(self):
-        '''
-        Updates the opsition of the top and bottom sprites for the lasers
-        '''
-        self.topSpriteRect[Y] = self.rect.top - 4
-        self.bottomSpriteRect[Y] = self.rect.bottom - self.topSprite.get_height()
+    # draws the hearts and jumps: filled in for the ones the player still has, empty for the rest
+    for i in range(len(hearts)):
+        if i < game.lives:
+            batch.append((loadedIcons[2], hearts[i]))
+        else:
+            batch.append((loadedIcons[3], hearts[i]))
 
+    for i in range(len(jumpIcons)):
+        if i < game.jumps:
+            batch.append((loadedIcons[0], jumpIcons[i]))
+        else:
+            batch.append((loadedIcons[1], jumpIcons[i]))
 
+    # draw score to the screen, put together from the cached digits
+    score = str(int(game.altitude))
+    batch.extend(scoreGlyphs.blitList(score, (300 - scoreGlyphs.width(score)/2, 60)))
 
-# functions
+    # draw star counter
+    batch.extend(starGlyphs.blitList(f"{game.stars}/4", (320, HEIGHT - 40)))
+    batch.append((loadedToks[2], (275, HEIGHT - 45)))
+    start = game.lap("hud", start)
 
-def killToken():
-    # Removes "gone" tokens from the token list
+    # the whole screen is redrawn when dirty rects are off, at the start of a game, when the background changes and when the screen flashes red
+    if not dirtyRects or game is not lastGame or background is not lastBackground or game.hit or lastDrawn is None:
+        if game.hit:    # flashes the screen red when an obstacle is hit
+            screen.fill((255, 0, 0))
+            batch.pop(0)    # the player is covered by the flash
+        else:
+            screen.blit(background, (0, 0))    # draws the background
+        drawn = screen.blits(batch, dirtyRects)
 
-    global tokenList
-    killList = []
-    for tok in range(len(tokenList)):
-        if tokenList[tok].gone == True:
-            killList.append(tok)    # adds the indices of "gone" platforms to list to be removed
+        lastGame = game
+        lastBackground = background
+        lastDrawn = drawn
+        if game.hit:
+            lastDrawn = None    # the next frame has to cover the whole flash
+        game.lap("blit", start)
+        return None
 
-    tokenList = kill(tokenList, killList)
-        
+    # otherwise only the places where things were last frame are covered with the background, and only those and the new places are updated
+    screen.blits([(background, rect, rect) for rect in lastDrawn], False)
+    drawn = screen.blits(batch, True)
+    changed = lastDrawn + drawn
+    lastDrawn = drawn
+    game.lap("blit", start)
+    return changed
 
 
-def scroll(objects):
-    # Adds the scroll speed to the objects to make them change position
-    speed = scrollSpeed
-
-    for i in objects:
-        i.rect[Y] += speed
-
-def center(objects):
-    # Adds to the positions of objects to instantly scroll up
-    diff = HEIGHT/1.5 - player.pos[Y]
-    for i in objects:
-        i.rect[Y] += diff
-
-    
-def killPlat(objects):
-    # Removes objects that are no longer visible
-    killList = []
-    for index in range(len(objects)):
-        if objects[index - 1].rect[1] > HEIGHT + 500:    # so that lasers will be off the screen when the platforms are removed
-            killList.append(index - 1)
-
-    return kill(objects, killList)
-
-def breakPlat():
-    # Removes breakable platforms and the objects on them when they are broken
-    killList = []
-    global platforms
-    global tokList
-    global obsList
-    for plat in range(len(platforms)):
-        if platforms[plat].mode == BREAK:
-            if platforms[plat].visible == False:
-                killList.append(plat)
-
-    platforms = kill(platforms, killList)
-
-    killList = []
-
-    for o in range(len(obsList)):
-        if obsList[o].plat not in platforms:
-            killList.append(o)
-
-    obsList = kill(obsList, killList)
-
-    
-def platsCollide(platform, platforms):
-    # Checks if a platform collides with other platforms; returns True if it does collide, False if it does not
-    if platform.mode == NORMAL or platform.mode == BREAK:
-        for plat in platforms:
-            if plat.mode == MOVE:
-                if platform.rect.colliderect(plat.pathRect):    # checks if a platform is in the path of any moving platforms
-                    return True
-            
-            if platform.rect.colliderect(plat.rect):
-                return True
-
-        return False
-
-    if platform.mode == MOVE:
-        if platform.valid:    # only checks if the platform is valid
-            for plat in platforms:
-                if plat.mode == MOVE:
-                        if plat.pathRect.colliderect(platform.pathRect):    # checks if a moving platform's path is in the path of any moving platforms
-                            return True
-                if plat.rect.colliderect(platform.pathRect):    # checks if any platforms are in the moving platform's path
-                    return True
 
-        else:
-            return True
-
-    return False
-
-    
-def checkPlat(checking):
-    # Checks that there is enougth distance between the platform and other platforms
-    global platforms
-    
-    if platsCollide(checking, platforms):
-        return True
-                
-    for plat in platforms:
-        distance = dist((plat.rect[X], plat.rect[Y]), (checking.rect[X], checking.rect[Y]))
-
-        if distance < minDist:
-            return True
-
-    return False
-
-
-def genPlat(range1, range2):
-    # Generates a platform - will re-generate it if it does not meet the requirements
-    global platforms, maxDist, minDist
-    
-    platType = randint(1, 101)    # determines the theme that the platform will be
-    if altitude < 14000:
-        spriteType = "grass"
-    if altitude >= 14000:
-        spriteType = "space"
-    
-    length = randint(0, 2)    # determines the length of platform it will be
-    if length == 0:
-        rectLength = 40
-    if length == 1:
-        rectLength = 50
-    if length == 2:
-        rectLength = 70
-
-    # generating the platform
-    if platType < normalChance:
-        invalid = True
-        # while loop that wil generate platforms until they fulfill the requirements
-        while invalid:
-            newRect = Rect(randint(0, WIDTH), randint(range1, range2), rectLength, PLATWIDTH)
-            newPlat = Platform(newRect, NORMAL, length, spriteType)
-            
-            invalid = checkPlat(newPlat)    # loops ends when "invalid" is False
-
-        platforms.append(newPlat)
-            
-            
-    elif platType < normalChance + breakChance:
-        invalid = True
-        while invalid:
-            newRect = Rect(randint(0, WIDTH), randint(range1, range2), rectLength, PLATWIDTH)
-            newPlat = Platform(newRect, BREAK, length, spriteType)
-            
-            invalid = checkPlat(newPlat)
-        
-        platforms.append(newPlat)
-        
-        
-    elif platType <= normalChance + movingChance + breakChance:
-        invalid = True
-        while invalid:
-            newRect = Rect(randint(0, WIDTH), randint(range1, range2), rectLength, PLATWIDTH)
-            newPlat = Platform(newRect, MOVE, length, spriteType)
-            
-            invalid = checkPlat(newPlat)
-        
-        if newPlat.valid:    # only appends if the platform if valid
-            platforms.append(newPlat)
- 
 
-def genTok():
+def menuLoop(background, buttons, texts = []):
     '''
-    Generates a token if a platform is marked for one 
+    Shows a menu until one of its buttons is clicked, and returns the index of that button (or QUITMENU if the window is closed).
+    It sleeps in event.wait() until something happens instead of redrawing every frame, and only redraws when the window needs it or the mouse moves on or off
+    a button, so a menu left open uses almost no CPU. "texts" are (surface, position) pairs drawn on top of the background
     '''
-    for plat in platforms:
-        if plat.attribute == "TNT":
-            if plat.drawnAtt == False:
-                newTok = TNT(plat)    # Generates new TNT object and adds it to the list
-                plat.drawnAtt = True
-                TNTList.append(newTok)
-                
-        # Generates new token object and adds it to the list
-        if plat.attribute == "jump":
-            if plat.drawnAtt == False:
-                newTok = Token(plat, JUMP)    
-                plat.drawnAtt = True
-                tokenList.append(newTok)
-
-        if plat.attribute == "star":
-            if plat.drawnAtt == False:
-                newTok = Token(plat, STAR)
-                plat.drawnAtt = True
-                tokenList.append(newTok)
-
-        if plat.attribute == "jetpack":
-            if plat.drawnAtt == False:
-                newTok = Token(plat, JETPACK)
-                plat.drawnAtt = True
-                tokenList.append(newTok)
-
-def genObs():
-    '''
-    Generates an obstacle if a platform is marked for one 
-    '''
-    for plat in platforms:
-        if plat.obstacle == "spike":
-                newObs = Obs(plat, SPIKE)    # Generates new obstacle and adds it to the list
-                obsList.append(newObs)
-        if plat.obstacle == "laser":
-            if plat.drawnAtt == False:
-                newObs = Obs(plat, LASER)
-                plat.drawnAtt = True
-                obsList.append(newObs)
-                
-
-def kill(list1, killList):
-    # removes the elements of "list1" at the indexes of the numbers of the "killList" and returns the resulting list
-    for i in killList:
-        list1[i] = 0    # sets the elements to zero
-    while 0 in list1:
-        list1.remove(0)    # removes the zeroes
-    return list1
-
-
-
-
+    hover = None    # the button that the mouse is over
+    redraw = True
+    choice = None
+    while choice is None:
+        if redraw:
+            screen.blit(background, (0, 0))
+            screen.blits(texts, False)
+            display.flip()
+            redraw = False
+            myClock.tick(MENUFPS)    # stops a stream of events (like the mouse moving) from redrawing more often than this
+
+        for evt in [event.wait()] + event.get():    # waits for the next event, then takes any others that came in with it
+            if evt.type == QUIT:
+                choice = QUITMENU
+            if evt.type == MOUSEBUTTONDOWN and choice is None:
+                for i in range(len(buttons)):
+                    if buttons[i].collidepoint(evt.pos):
+                        choice = i
+            if evt.type in (VIDEOEXPOSE, WINDOWEXPOSED, WINDOWRESTORED):    # the window was covered up or minimised, so it has to be drawn again
+                redraw = True
+
+        newHover = None
+        for i in range(len(buttons)):
+            if buttons[i].collidepoint(mouse.get_pos()):
+                newHover = i
+        if newHover != hover:
+            hover = newHover
+            setCursor(hover is not None)    # shows that the button can be clicked
+            redraw = True
+
+    setCursor(False)
+    return choice
+
+
+def setCursor(onButton):
+    # the hand cursor over buttons, the normal arrow everywhere else
+    try:
+        if onButton:
+            mouse.set_cursor(SYSTEM_CURSOR_HAND)
+        else:
+            mouse.set_cursor(SYSTEM_CURSOR_ARROW)
+    except error:    # some systems don't have cursors
+        pass
 
 
 # variables that determine which loop is running
@@ -772,514 +277,187 @@ instructionsButtons = [Rect(210, 600, 180, 49)]
 difficultyButtons = [Rect(210, 192, 180, 49), Rect(210, 257, 180, 49), Rect(210, 322, 180, 49), Rect(210, 458, 180, 49)]
 gameOverButtons = [Rect(210, 488, 180, 49)]
 
-highScoreStuff = open("highscore.txt", "a")
-highScoreList = open("highscore.txt").read().strip().split("\n")
-highScore = int(highScoreList[-1])    # the last element of the file will he the highest number
-
-
-while page != "quit":    # game will run until the page is set to "quit"
-    if page == "menu":
-        menuRunning = True
-    else:
-        menuRunning = False
-    if page == "instructions":
-        instructionsRunning = True
-    else:
-        instructionsRunning = False
-    if page == "difficulty":
-        difficultyRunning = True
-    else:
-        difficultyRunning = False
-    if page == "gameover":
-        gameOverRunning = True
-    else:
-        gameOverRunning = False
-    if page == "main":
-        mainRunning = True
-    else:
-        mainRunning = False
-
-
-# Main menu
-    while menuRunning:
-        mouseDown = False
-        space = False
-        down = False
-        for evt in event.get():
-            if evt.type == QUIT:
-                menuRunning = False
-                page = "quit"    # sets page to "quit", ending the loop
-            if evt.type == MOUSEBUTTONDOWN:
-                mouseDown = True
-            if evt.type == KEYDOWN:
-                if evt.key == K_SPACE:
-                    space = True
-                if evt.key == K_DOWN:
-                    down = True
-
-        mb = mouse.get_pressed()
-        mx, my = mouse.get_pos()
-
-        # drawing the menu background
-        screen.blit(loadedMenu[0], (0, 0))
-
-        # detecting mouse collisions with buttons
-        if menuButtons[0].collidepoint((mx, my)):
-            if mouseDown:
-                page = "difficulty"
-                menuRunning = False
-
-        if menuButtons[1].collidepoint((mx, my)):
-            if mouseDown:
-                page = "instructions"
-                menuRunning = False
-
+STEPTIME = 1 / FPS    # the game is always stepped at FPS steps a second
+RENDERFPS = 144    # the most times a second the screen is drawn, it is drawn in between steps when this is more than FPS
+MAXSTEPS = 5    # the most steps that are done to catch up before one frame is drawn
 
+QUITMENU = -1    # what menuLoop() returns when the window is closed
+MENUFPS = 30    # the most times a second a menu is redrawn, e.g. while the mouse is moving over it
 
-        display.flip()
+dirtyRects = "dirty" in sys.argv    # "python Game.py dirty" only updates the parts of the screen that changed each frame, for slow computers
+recording = "record" in sys.argv    # "python Game.py record" saves every game to the replays folder, to be played back with "python Simulation.py replay <file>" - games that make the leaderboard are always saved
+autoplay = "autoplay" in sys.argv    # "python Game.py autoplay" plays the games by itself (Autopilot.py), for demos
+chunked = "nochunks" not in sys.argv    # "python Game.py nochunks" makes the level on the game's thread instead of ahead on a worker thread (Chunks.py)
+REPLAYFOLDER = "replays"
+lastGame = None    # what was drawn last frame, used by the dirty rects
+lastBackground = None
+lastDrawn = None
+laserColumns = {}    # laser width: the column it is drawn from
+profiler = FrameProfiler()    # the F3 overlay
 
-    # instructions
-    while instructionsRunning:
-        mouseDown = False
-        space = False
-        down = False
-        for evt in event.get():
-            if evt.type == QUIT:
-                instructionsRunning = False
-                page = "quit"
-            if evt.type == MOUSEBUTTONDOWN:
-                mouseDown = True
-            if evt.type == KEYDOWN:
-                if evt.key == K_SPACE:
-                    space = True
-                if evt.key == K_DOWN:
-                    down = True
-
-        mb = mouse.get_pressed()
-        mx, my = mouse.get_pos()
-        
-        screen.blit(loadedMenu[1], (0, 0))
+# rects for the icons that show the number of lives and jumps had
+hearts = [Rect(10 + i*40, HEIGHT - 40, 30, 30) for i in range(5)]
+jumpIcons = [Rect(480 + i*40, HEIGHT - 40, 30, 30) for i in range(3)]
 
-        # button-mouse collisions
-        if instructionsButtons[0].collidepoint((mx, my)):
-            if mouseDown:
-                page = "menu"
-                instructionsRunning = False
+# the menus and the game only run when Game.py is run, so other scripts (like Benchmark.py) can import it to use drawGame()
+if __name__ == "__main__":
+    highScores = HighScoreStore()    # the leaderboard for each difficulty, read once from a small file of a fixed size
 
 
-        display.flip()
+    while page != "quit":    # game will run until the page is set to "quit"
+        if page == "menu":
+            menuRunning = True
+        else:
+            menuRunning = False
+        if page == "instructions":
+            instructionsRunning = True
+        else:
+            instructionsRunning = False
+        if page == "difficulty":
+            difficultyRunning = True
+        else:
+            difficultyRunning = False
+        if page == "gameover":
+            gameOverRunning = True
+        else:
+            gameOverRunning = False
+        if page == "main":
+            mainRunning = True
+        else:
+            mainRunning = False
 
 
-    # difficulty
+    # Main menu
+        if menuRunning:
+            choice = menuLoop(loadedMenu[0], menuButtons)
+            if choice == QUITMENU:
+                page = "quit"    # sets page to "quit", ending the loop
+            if choice == 0:
+                page = "difficulty"
+            if choice == 1:
+                page = "instructions"
 
-    while difficultyRunning:
-        mouseDown = False
-        space = False
-        down = False
-        for evt in event.get():
-            if evt.type == QUIT:
-                difficultyRunning = False
+        # instructions
+        if instructionsRunning:
+            choice = menuLoop(loadedMenu[1], instructionsButtons)
+            if choice == QUITMENU:
                 page = "quit"
-            if evt.type == MOUSEBUTTONDOWN:
-                mouseDown = True
-            if evt.type == KEYDOWN:
-                if evt.key == K_SPACE:
-                    space = True
-                if evt.key == K_DOWN:
-                    down = True
-
-        mb = mouse.get_pressed()
-        mx, my = mouse.get_pos()
-        screen.blit(loadedMenu[2], (0, 0))
-        
-
-        if difficultyButtons[3].collidepoint((mx, my)):
-            if mouseDown:
+            if choice == 0:
                 page = "menu"
-                difficultyRunning = False
-
-        # setting the difficulty mode
-        if difficultyButtons[0].collidepoint((mx, my)):
-            if mouseDown:
-                gameMode = "easy"
-                page = "main"
-                difficultyRunning = False
 
-        if difficultyButtons[1].collidepoint((mx, my)):
-            if mouseDown:
-                gameMode = "normal"
-                page = "main"
-                difficultyRunning = False
+        # difficulty
+        if difficultyRunning:
+            choice = menuLoop(loadedMenu[2], difficultyButtons)
+            if choice == QUITMENU:
+                page = "quit"
+            if choice == 3:
+                page = "menu"
 
-        if difficultyButtons[2].collidepoint((mx, my)):
-            if mouseDown:
-                gameMode = "hard"
+            # setting the difficulty mode
+            if choice in (0, 1, 2):
+                gameMode = ["easy", "normal", "hard"][choice]
                 page = "main"
-                difficultyRunning = False
-
-
-        display.flip()
 
-
-    written = False
-    while gameOverRunning:
-        mouseDown = False
-        space = False
-        down = False
-        for evt in event.get():
-            if evt.type == QUIT:
-                gameOverRunning = False
+        # the autopilot's games aren't put on the leaderboard or saved as replays, and the next game starts straight away so it can run unattended
+        if gameOverRunning and autoplay:
+            print(f"autoplay: {gameMode} scored {int(game.altitude)} in {game.frames} frames")
+            page = "main"
+            continue
+
+        if gameOverRunning:
+            place = highScores.add(gameMode, int(game.altitude))    # goes on the leaderboard if it is good enough, and is saved on a background thread
+            if recording or place is not None:    # a score on the leaderboard always keeps its replay, so it can be checked with Verify.py
+                highScores.saveFile(os.path.join(REPLAYFOLDER, f"{gameMode}-{game.seed}.replay"), packReplay(game))    # written on the same thread as the scores
+            highScore = highScores.best(gameMode)    # the high score for this difficulty
+
+            # the scores are rendered once, since they don't change while the menu is up
+            scoreText = renderText(starFnt, f"Score: {int(game.altitude)}", (255, 255, 255))
+            highScoreText = renderText(starFnt, f"High Score: {int(highScore)}", (255, 255, 0))
+            texts = [(scoreText, (300 - scoreText.get_width()/2, 350)), (highScoreText, (300 - highScoreText.get_width()/2, 300))]
+
+            choice = menuLoop(loadedMenu[3], gameOverButtons, texts)
+            if choice == QUITMENU:
                 page = "quit"
-            if evt.type == MOUSEBUTTONDOWN:
-                mouseDown = True
-            if evt.type == KEYDOWN:
-                if evt.key == K_SPACE:
-                    space = True
-                if evt.key == K_DOWN:
-                    down = True
-
-        mb = mouse.get_pressed()
-        mx, my = mouse.get_pos()
-        screen.blit(loadedMenu[3], (0, 0))
-        scoreText = starFnt.render(f"Score: {int(altitude)}", True, (255, 255, 255))    # draws the score to the screen
-        screen.blit(scoreText, (300 - scoreText.get_width()/2, 350))
-
-        if int(altitude) > highScore and written == False:    # writes the score to the file if the score is larger than the last value
-            highScore = int(altitude)
-            written = True
-            highScoreStuff.write(str(int(altitude)) + "\n")
-        
-        scoreText = starFnt.render(f"High Score: {int(highScore)}", True, (255, 255, 0))    # draws the high score to the screen
-        screen.blit(scoreText, (300 - scoreText.get_width()/2, 300))
-        
-        if gameOverButtons[0].collidepoint((mx, my)) and mouseDown:
-            page = "menu"
-            gameOverRunning = False
-
-        display.flip()
-
-
-
-    # setting the starting conditions of the game
-    
-    jumps = 3
-    stars = 0
-    lives = 5
-
-    # chances for having a type of platform
-    movingChance = 30
-    breakChance = 10
-    normalChance = 60
-
-    # chances for having an object on a platform
-    TNTChance = 10
-    jumpChance = 10
-    starChance = 3
-    jetpackChance = 2
-    spikeChance = 10
-    laserChance = 10
-    spikeHeight = 30
-    laserWidth = 15
-  
-    startingScroll = 3     # the base scrolling speed
-    scrollSpeed = startingScroll
-    genSpeed = 30    # the speed that the platforms that are generated at
-
-    # setting conditions based on the game mode
-    if gameMode == "easy":
-        movingChance = 30
-        breakChance = 5
-        normalChance = 65
-
-        TNTChance = 10
-        jumpChance = 20
-        starChance = 8
-        jetpackChance = 5
-        spikeChance = 3
-        laserChance = 2
-        spikeHeight = 30
-        laserWidth = 5
-
-        startingScroll = 1
-        scrollSpeed = startingScroll
-        genSpeed = 30
-        
-    if gameMode == "normal":
-        movingChance = 40
-        breakChance = 20
-        normalChance = 40
-
-        TNTChance = 10
-        jumpChance = 10
-        starChance = 5
-        jetpackChance = 3
-        spikeChance = 10
-        laserChance = 10
-        spikeHeight = 30
-        laserWidth = 10
-
-        startingScroll = 2
-        scrollSpeed = startingScroll
-        genSpeed = 30
-
-    if gameMode == "hard":
-        movingChance = 40
-        breakChance = 40
-        normalChance = 20
-
-        TNTChance = 15
-        jumpChance = 8
-        starChance = 2
-        jetpackChance = 1
-        spikeChance = 15
-        laserChance = 15
-        spikeHeight = 30
-        laserWidth = 15
-
-        startingScroll = 3
-        scrollSpeed = startingScroll
-        genSpeed = 30
-
-
-        
-
-        
-    frames = 0     # the number of frames that have passed
-    altitude = 0    # the distance that the screen has moves since the game started
-    scoreText = fnt.render(str(altitude), False, (255, 255, 255))
-
-    hearts = [Rect(10 + i*40, HEIGHT - 40, 30, 30) for i in range(5)]    # rects representing the number of lives had
-    heartsState = [True for i in range(5)]    # list for keeping track of which hearts are filled in
-    jumpIcons = [Rect(480 + i*40, HEIGHT - 40, 30, 30) for i in range(3)]    # same function as previous two lists
-    jumpState = [True for i in range(3)]
-
-    player = Player([200, 400], Rect(200, 400, 57, 81))    # player object that is what the user controls
-    ground = Platform(Rect(200, 500, 70, 35), NORMAL, 2, "grass")    # starting platform that the player spawns on
-    ground.attribute = "none"    # setting the base platform to not having anything on it
-    ground.obstacle = "none"
-    platforms = [ground]    # list that stores all platforms that will be drawn to the screen
-    
-    TNTList = []    # list for all the TNT objects
-    tokenList = []    # list for all the token objects
-    obsList = []    # list for all the obstacles
-    timer = 0
-
-    background = loadedBack[1]    # starting background
-    listList = [platforms, TNTList, tokenList, obsList]    # list for all the main lists that are drawn
-
-    for i in range(9):    # generates starting platforms
-        genPlat(0, 500)
+            if choice == 0:
+                page = "menu"
 
-    while mainRunning:
-        space = False
-        down = False
-        spaceUp = False
-        for evt in event.get():
-            if evt.type == QUIT:
+        if not mainRunning:
+            continue
+
+        # setting the starting conditions of the game
+        game = GameState(gameMode, chunked = chunked)    # all of the gameplay is kept and updated in here, with the level made ahead on a worker thread unless it is turned off
+        if profiler.visible:    # the overlay stays on from the last game
+            game.profiler = profiler
+
+        inputs = Inputs()
+        pilot = Autopilot()
+        accumulator = 0    # time that has passed that the game hasn't been stepped for yet
+        myClock.tick()    # so the time spent in the menus isn't counted
+
+        while mainRunning:
+            frameStart = perf_counter_ns()
+            for evt in event.get():
+                if evt.type == QUIT:
+                    mainRunning = False
+                    page = "quit"
+                if evt.type == KEYDOWN:
+                    if evt.key == K_SPACE:
+                        inputs.space = True
+                    if evt.key == K_F3:    # turns the profiler overlay on and off
+                        profiler.visible = not profiler.visible
+                        if profiler.visible:
+                            game.profiler = profiler
+                        else:
+                            game.profiler = None
+                            lastDrawn = None    # redraws the whole screen to get rid of the overlay
+                    if evt.key == K_F4 and profiler.filled > 0:
+                        print("saved the profile to", profiler.dumpCSV())
+                if evt.type == KEYUP:
+                    if evt.key == K_SPACE:
+                        inputs.spaceUp = True
+
+            keys = key.get_pressed()
+            inputs.left = keys[K_LEFT]
+            inputs.right = keys[K_RIGHT]
+            game.lap("events", frameStart)
+
+            # the game is stepped at exactly FPS steps a second however fast the screen is drawn, catching up with more steps after a slow frame
+            accumulator += myClock.tick(RENDERFPS) / 1000
+            steps = 0
+            while accumulator >= STEPTIME and steps < MAXSTEPS and not game.over:    # no steps after the game ends, or they would add to the score and the replay
+                if autoplay:
+                    inputs = pilot.inputs(game)
+                game.step(inputs)    # updates the game by one frame
+                inputs.space = False    # presses and releases only count for one step
+                inputs.spaceUp = False
+                accumulator -= STEPTIME
+                steps += 1
+            if steps == MAXSTEPS:    # too far behind to catch up, so the rest is dropped instead of the game slowing down more and more
+                accumulator = min(accumulator, STEPTIME)
+
+            if game.over:    # the game ends when the player loses all their lives or goes off the bottom of the screen
+                page = "gameover"
                 mainRunning = False
-                page = "quit"
-            if evt.type == KEYDOWN:
-                if evt.key == K_SPACE:
-                    space = True
-                if evt.key == K_DOWN:
-                    down = True
-            if evt.type == KEYUP:
-                if evt.key == K_SPACE:
-                    spaceUp = True
-                    
-        frames += 1
-
-        # set the list for jumps and hearts to False so it can be updated
-        for i in range(len(heartsState)):
-            heartsState[i] = False
-        for i in range(len(jumpState)):
-            jumpState[i] = False
-
-        # sets the changing background based on altitude
-        if altitude >= 10000:
-            background = loadedBack[2]
-        if altitude >= 14000:
-            background = loadedBack[3]
-        if altitude >= 15000:
-            background = loadedBack[0]
-            
-        screen.blit(background, (0, 0))    # draws the background
-        
-        
-        for lis in listList:    # does the things that apply to almost all game objects
-            scroll(lis)
-            killPlat(lis)
-        
-        player.pos[Y] += scrollSpeed    # also scrolls the player
 
-        
-        if player.pos[Y] <= -60:    # re-centers the screen if the player goes off from the top
-            for i in range(7):
-                genPlat(-600, -300)    # generates more platforms so there is no big gap
-            for lis in listList:
-                center(lis)
-
-            diff = HEIGHT/1.5 - player.pos[Y]
-            player.pos[Y] += diff
-            altitude += diff    # adds the change to the score
-            
-            
-        # speeds up the platform generation rate as the scrolling speeds up so the density stays the same
-        if scrollSpeed == startingScroll:
-            genSpeed = 30
-        if scrollSpeed == startingScroll + 1:
-            genSpeed = 20
-        if scrollSpeed == startingScroll + 2:
-            genSpeed = 15
-        
-        if frames%genSpeed == 0:    # generates the platforms
-            genPlat(-300, -20)
-
-        genTok()    # generates the tokens and obstacles
-        genObs()
-
-        # updating the player's conditions  
-        if space:
-            player.playerJump()
-        if spaceUp:
-            player.jumpCancel()    # cancels the jump if the spacebar is released
-
-        player.move()
-        player.spriteChange()
-        if player.jetpack:
-            player.jetpacking()
-        player.collide(platforms)
-        player.invincibility()
-        screen.blit(player.sprite, player.rect)
+            changed = drawGame(game, accumulator / STEPTIME)
+            if profiler.visible:
+                overlay = profiler.draw(screen)
+                if changed is not None:
+                    changed.append(overlay)
 
-        
-        breakPlat()    # update breakable platforms
-        killToken()    # remove consumed tokens from list
-
-
-        # drawing obstacles and tokens
-        for obst in obsList:
-            if obst.mode == SPIKE:
-                screen.blit(obst.sprite, (obst.rect[X], obst.rect[Y]))
-            if obst.mode == LASER:
-                obst.laserUpdate()
-                draw.rect(screen, obst.colour, obst.rect)
-                screen.blit(obst.topSprite, obst.topSpriteRect)
-                screen.blit(obst.bottomSprite, obst.bottomSpriteRect)
-            obst.obsCollide()
-
-        for tok in tokenList:
-            screen.blit(tok.sprite, (tok.rect[X], tok.rect[Y]))
-
-            # calls the functions for the tokens
-            if tok.mode == JUMP:
-                tok.doubJumpTok()
-            if tok.mode == STAR:
-                tok.starTok()
-            if tok.mode == JETPACK:
-                tok.jetpackTok()
-
-
-        for plat in platforms:
-                # drawing platforms and calling platform functions
-                if plat.mode == NORMAL:
-                    if plat.spriteType == "grass":
-                        if plat.length == 50:
-                            screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y] - 10))    # offsets the drawing of the sprite so the player can stand on the surface of the sprite
-                        elif plat.length == 70:
-                            screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y] - 15))
-                        else:
-                            screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y]))
-                        
-                    if plat.spriteType == "space":
-                        screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y]))
-                if plat.mode == BREAK:
-
-                    plat.breakMode(player)    # updates broken platforms
-
-                    if plat.visible:
-                        screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y]))
-                        
-                if plat.mode == MOVE:
-                    plat.moveMode()   # updates the conditions of moving platforms
-                    plat.pathUpdate()
-                    
-                    if plat.spriteType == "grass":
-                        if plat.length == 50:
-                            screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y] - 10))
-                        elif plat.length == 70:
-                            screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y] - 15))
-                        else:
-                            screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y]))
-                        
-                    if plat.spriteType == "space":
-                        screen.blit(plat.sprite, (plat.rect[X], plat.rect[Y]))
-
-
-        # drawing TNT
-        if TNTList:
-            for i in range(len(TNTList)):
-                if i < len(TNTList):
-                    screen.blit(TNTList[i].sprite, (TNTList[i].rect[X], TNTList[i].rect[Y]))
-                    TNTList[i].explode()
-                    if TNTList[i].exploded == True:
-                        TNTList = kill(TNTList, [i])    # removes exploded TNT from the list
-
-
-        # updates the hearts and jumps drawn
-        for i in range(lives):
-            if lives > 0:
-                heartsState[i] = True
-
-        for i in range(jumps):
-            if jumps > 0:
-                jumpState[i] = True
-
-        # draws the hearts and jumps based on the list of heart/jump states: True for filled in, False for empty
-        for i in range(len(heartsState)):
-            if heartsState[i] == True:
-                screen.blit(loadedIcons[2], hearts[i])
-            if heartsState[i] == False:
-                screen.blit(loadedIcons[3], hearts[i])
-
-        for i in range(len(jumpState)):
-            if jumpState[i] == True:
-                screen.blit(loadedIcons[0], jumpIcons[i])
-            if jumpState[i] == False:
-                screen.blit(loadedIcons[1], jumpIcons[i])
-                                
-        
-        if lives == 0 or player.pos[Y] > 1000:    # the game ends when the player loses all their lives or goes off the bottom of the screen
-            page = "gameover"
-            mainRunning = False
-
-        if stars == 4:    # slows the scrolling down when the player obtains 4 stars
-            stars = 0
-            scrollSpeed = startingScroll
-        
-        if scrollSpeed < startingScroll + 2:
-            timer += 1
+            flipStart = perf_counter_ns()
+            if changed is None:
+                display.flip()
+            else:
+                display.update(changed)
+            if profiler.visible:
+                game.lap("flip", flipStart)
+                profiler.endFrame(game)
 
-            if timer%(5*FPS) == 0:    # adds to the scroll speed after some amount of time
-                scrollSpeed += 1
-                timer = 0
+        game.close()    # stops the chunk worker however the game ended, including the window being closed in the middle of it
 
-        # draw score to the screen
-        scoreText = fnt.render(str(int(altitude)), True, (255, 255, 255))
-        screen.blit(scoreText, (300 - scoreText.get_width()/2, 60))
-        
-        # draw star counter
-        starText = starFnt.render(f"{stars}/4", True, (255, 255, 0))
-        screen.blit(starText, (320, HEIGHT - 40))
-        screen.blit(loadedToks[2], (275, HEIGHT - 45))
-    
-        altitude += scrollSpeed    # update the current altitude
-        myClock.tick(FPS)
-
-        display.flip()
-
-highScoreStuff.close()
-quit()
+    highScores.close()    # waits for the last score to be saved
+    quit()
         
 
 
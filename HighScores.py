@@ -0,0 +1,186 @@
+# HighScores.py
+'''
+The high scores, kept as a leaderboard of the best TOPSCORES for each difficulty in difficulties.json, so a new difficulty gets its own leaderboard without any
+changes here. They are all in one small file (highscores.bin) with a fixed size for each leaderboard, named after its difficulty, so reading it when the game starts
+takes the same time however many games have been played. Leaderboards for difficulties that aren't in difficulties.json any more are kept in the file.
+The file is only ever replaced whole: a new copy is written next to it and renamed over it, so it is never left half written if the game is closed at the wrong time.
+The writing is done on a background thread so the game over screen never waits for the disk, and the replays of the scores that make the leaderboard are written
+by the same thread (saveFile).
+The first time the game starts without highscores.bin, the scores from the old highscore.txt (which didn't keep the difficulty) are put on the normal leaderboard.
+'''
+
+import os
+import queue
+import struct
+import threading
+from time import time
+from Simulation import profiles
+
+SCOREFILE = "highscores.bin"
+OLDSCOREFILE = "highscore.txt"
+SCOREMAGIC = b"FSHS"    # the start of the file
+SCOREVERSION = 2
+TOPSCORES = 10    # how many scores each difficulty keeps
+DIFFICULTIES = list(profiles)    # every difficulty in difficulties.json has a leaderboard
+
+HEADER = struct.Struct("<4sBBB")    # magic, version, TOPSCORES, how many leaderboards
+NAME = struct.Struct("<32s")    # the difficulty a leaderboard is for, at the start of it
+ENTRY = struct.Struct("<II")    # score, when it was set (seconds since 1970) - 0 for an empty place on the leaderboard
+BOARDSIZE = NAME.size + TOPSCORES * ENTRY.size
+MAXBOARDS = 255
+
+# version 1 of the file had no names, just the easy, normal and hard leaderboards in that order
+OLDHEADER = struct.Struct("<4sBB")    # magic, version, TOPSCORES
+OLDDIFFICULTIES = ["easy", "normal", "hard"]
+OLDFILESIZE = OLDHEADER.size + len(OLDDIFFICULTIES) * TOPSCORES * ENTRY.size
+
+
+class HighScoreStore():
+    '''
+    The leaderboards in memory, which are what the game reads, and the thread that saves them. add() changes the leaderboard straight away and queues a save
+    '''
+    def __init__(self, fileName = SCOREFILE, oldFile = OLDSCOREFILE):
+        self.fileName = fileName
+        self.boards = {}    # difficulty: [(score, when)], highest first
+        for difficulty in DIFFICULTIES:
+            self.boards[difficulty] = []
+        self.saves = queue.Queue()    # (file name, bytes) waiting to be written - the packed leaderboards and replays - and None stops the thread
+        self.thread = None
+
+        if not self.load() and os.path.exists(oldFile):
+            self.migrate(oldFile)
+
+    def load(self):
+        '''
+        Reads the leaderboards from the file, returns False if there isn't a file that can be read. A version 1 file is read and saved again as the current version
+        '''
+        try:
+            with open(self.fileName, "rb") as scoreFile:
+                data = scoreFile.read(HEADER.size + MAXBOARDS * BOARDSIZE + 1)
+        except OSError:
+            return False
+
+        if len(data) == OLDFILESIZE and OLDHEADER.unpack_from(data) == (SCOREMAGIC, 1, TOPSCORES):
+            offset = OLDHEADER.size
+            for difficulty in OLDDIFFICULTIES:
+                offset = self.readBoard(data, offset, difficulty)
+            self.save()
+            return True
+
+        if len(data) < HEADER.size:
+            return False
+        magic, version, top, count = HEADER.unpack_from(data)
+        if (magic, version, top) != (SCOREMAGIC, SCOREVERSION, TOPSCORES) or len(data) != HEADER.size + count * BOARDSIZE:
+            return False
+        offset = HEADER.size
+        for i in range(count):
+            difficulty = NAME.unpack_from(data, offset)[0].rstrip(b"\0").decode()
+            offset = self.readBoard(data, offset + NAME.size, difficulty)
+        return True
+
+    def readBoard(self, data, offset, difficulty):
+        # reads one leaderboard's scores starting at "offset", and returns where the next leaderboard starts
+        board = self.boards.setdefault(difficulty, [])
+        for i in range(TOPSCORES):
+            score, when = ENTRY.unpack_from(data, offset)
+            if when != 0:
+                board.append((score, when))
+            offset += ENTRY.size
+        return offset
+
+    def migrate(self, oldFile):
+        '''
+        Puts the scores from the old one-line-per-record file on the normal leaderboard and saves the new file
+        '''
+        try:
+            with open(oldFile) as scoreFile:
+                lines = scoreFile.read().split()
+        except OSError:
+            return
+        when = int(os.path.getmtime(oldFile))    # the old file didn't keep when each score was set
+        scores = sorted(set(int(line) for line in lines if line.isdigit()), reverse = True)
+        self.boards["normal"] = [(score, when) for score in scores[:TOPSCORES]]
+        self.save()
+
+    def best(self, difficulty):
+        # the high score for a difficulty, 0 if there isn't one yet
+        if self.boards.get(difficulty):
+            return self.boards[difficulty][0][0]
+        return 0
+
+    def add(self, difficulty, score):
+        '''
+        Puts a score on its difficulty's leaderboard if it is good enough, and returns its place (0 for the best) or None if it didn't make it
+        '''
+        board = self.boards.setdefault(difficulty, [])    # a difficulty that was added while the game was running still gets a leaderboard
+        place = 0
+        while place < len(board) and board[place][0] >= score:    # a new score goes after the scores it ties with
+            place += 1
+        if place >= TOPSCORES:
+            return None
+
+        board.insert(place, (score, int(time())))
+        del board[TOPSCORES:]
+        self.save()
+        return place
+
+    def pack(self):
+        # the bytes of the whole file
+        boards = list(self.boards)[:MAXBOARDS]
+        data = bytearray(HEADER.pack(SCOREMAGIC, SCOREVERSION, TOPSCORES, len(boards)))
+        for difficulty in boards:
+            board = self.boards[difficulty]
+            data += NAME.pack(difficulty.encode())
+            for i in range(TOPSCORES):
+                if i < len(board):
+                    data += ENTRY.pack(*board[i])
+                else:
+                    data += ENTRY.pack(0, 0)
+        return bytes(data)
+
+    def save(self):
+        # queues the current leaderboards to be written
+        self.saveFile(self.fileName, self.pack())
+
+    def saveFile(self, fileName, data):
+        # queues any file to be written on the writer thread, starting the thread the first time
+        self.saves.put((fileName, data))
+        if self.thread is None:
+            self.thread = threading.Thread(target = self.run, name = "high score writer", daemon = True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            saves = [self.saves.get()]
+            while not self.saves.empty():
+                saves.append(self.saves.get())
+            newest = {}    # only the newest copy of each file needs writing, in the order they were first queued
+            for save in saves:
+                if save is not None:
+                    newest[save[0]] = save[1]
+            for fileName, data in newest.items():
+                try:
+                    self.write(fileName, data)
+                except OSError:    # the scores are still kept for the rest of this game, they just aren't saved
+                    pass
+            if None in saves:    # still writes what came before it
+                return
+
+    def write(self, fileName, data):
+        # writes a new copy of the file and renames it over the old one, so the file is always either the old one or the new one
+        folder = os.path.dirname(fileName)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        temporary = fileName + ".tmp"
+        with open(temporary, "wb") as outFile:
+            outFile.write(data)
+            outFile.flush()
+            os.fsync(outFile.fileno())
+        os.replace(temporary, fileName)
+
+    def close(self):
+        # waits for the last save to be written, for when the game is closing
+        if self.thread is not None:
+            self.saves.put(None)
+            self.thread.join()
+            self.thread = None
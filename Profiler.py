@@ -0,0 +1,124 @@
+# Profiler.py
+'''
+An overlay that shows where the time in each frame goes, for finding out why the game stutters. While it is on, every part of a frame (the event pump, scrolling,
+generating, collisions, drawing the objects, the HUD, blitting and flipping) is timed with perf_counter_ns and kept for the last PROFILEFRAMES frames in a ring
+buffer, along with how many platforms, obstacles, tokens and TNT there were. It is drawn as a stacked graph of the frame times.
+In the game, F3 turns the overlay on and off and F4 saves the frames in the buffer to a CSV file. When the overlay is off nothing is recorded.
+'''
+
+import csv
+from time import strftime
+from pygame import *
+
+PROFILEFRAMES = 240    # the number of frames kept, one pixel across each in the graph
+GRAPHHEIGHT = 100
+GRAPHMS = 33.3    # the frame time at the top of the graph, two frames at 60 fps
+
+# the parts of a frame, in the order they are stacked in the graph
+PHASES = ["events", "scroll", "generate", "collide", "score", "draw", "hud", "blit", "flip"]
+PHASECOLOURS = [(150, 150, 150), (0, 120, 255), (0, 220, 120), (255, 60, 60), (200, 200, 0), (255, 140, 0), (255, 0, 255), (0, 220, 220), (255, 255, 255)]
+PHASEINDEX = {PHASES[i]: i for i in range(len(PHASES))}
+COUNTNAMES = ["platforms", "TNT", "tokens", "obstacles"]    # in the same order as listList
+
+
+class FrameProfiler():
+    '''
+    The ring buffer of frame timings and the overlay that shows them. It is the GameState's profiler while it is visible, and the rest of the frame is added with add()
+    '''
+    def __init__(self, size = PROFILEFRAMES):
+        self.size = size
+        self.visible = False
+        self.current = [0] * len(PHASES)    # nanoseconds for each phase of the frame being timed
+        self.times = [[0] * len(PHASES) for i in range(size)]    # the ring buffer
+        self.counts = [[0] * len(COUNTNAMES) for i in range(size)]
+        self.frameNumbers = [0] * size
+        self.index = 0    # where the next frame goes in the ring buffer
+        self.filled = 0    # how many frames are in the ring buffer
+        self.recorded = 0    # how many frames have been recorded in total, which keeps going up once the buffer is full
+
+        self.fnt = None    # only made when the overlay is first shown
+        self.graph = Surface((size, GRAPHHEIGHT), SRCALPHA)    # scrolled along one pixel each frame, so only the newest column is drawn
+        self.legend = None
+        self.rect = Rect(5, 5, size + 10, GRAPHHEIGHT + 10)
+
+    def add(self, phase, nanoseconds):
+        self.current[PHASEINDEX[phase]] += nanoseconds
+
+    def endFrame(self, game):
+        '''
+        Moves the frame that was just timed into the ring buffer and adds its column to the graph
+        '''
+        frameTimes = self.current
+        self.current = self.times[self.index]    # the oldest frame's list is reused for the next frame instead of making a new one
+        for i in range(len(self.current)):
+            self.current[i] = 0
+        self.times[self.index] = frameTimes
+
+        for i in range(len(COUNTNAMES)):
+            self.counts[self.index][i] = len(game.listList[i])
+        self.frameNumbers[self.index] = game.frames
+        self.index = (self.index + 1) % self.size
+        self.filled = min(self.filled + 1, self.size)
+        self.recorded += 1
+
+        self.graph.scroll(-1, 0)
+        self.graph.fill((0, 0, 0, 160), (self.size - 1, 0, 1, GRAPHHEIGHT))
+        y = GRAPHHEIGHT
+        for i in range(len(PHASES)):
+            height = frameTimes[i] / 1e6 / GRAPHMS * GRAPHHEIGHT
+            if height > 0:
+                self.graph.fill(PHASECOLOURS[i], (self.size - 1, round(y - height), 1, max(1, round(height))))
+                y -= height
+        self.graph.set_at((self.size - 1, GRAPHHEIGHT // 2), (255, 0, 0))    # the line at 16.7 ms
+
+        if self.legend is None or self.recorded % 15 == 0:    # the text only changes a few times a second so it can be read
+            self.legend = self.renderLegend()
+
+    def order(self):
+        # the indexes of the frames in the ring buffer, from oldest to newest
+        return [(self.index - self.filled + i) % self.size for i in range(self.filled)]
+
+    def renderLegend(self):
+        '''
+        The average time of each phase over the buffer and the newest list sizes
+        '''
+        if self.fnt is None:
+            self.fnt = font.SysFont("Consolas", 12)
+        lines = []
+        frames = self.order()
+        for i in range(len(PHASES)):
+            average = sum(self.times[f][i] for f in frames) / max(1, len(frames)) / 1e6
+            lines.append((f"{PHASES[i]:9}{average:6.2f} ms", PHASECOLOURS[i]))
+        if frames:
+            newest = frames[-1]
+            for i in range(len(COUNTNAMES)):
+                lines.append((f"{COUNTNAMES[i]:9}{self.counts[newest][i]:6}", (255, 255, 255)))
+
+        lineHeight = self.fnt.get_linesize()
+        legend = Surface((130, lineHeight * len(lines) + 6), SRCALPHA)
+        legend.fill((0, 0, 0, 160))
+        for i in range(len(lines)):
+            legend.blit(self.fnt.render(lines[i][0], True, lines[i][1]), (4, 3 + i * lineHeight))
+        return legend
+
+    def draw(self, surface):
+        # draws the overlay in the top left corner and returns the area it covers
+        if self.legend is None:
+            self.legend = self.renderLegend()
+        surface.blit(self.graph, (self.rect.x + 5, self.rect.y + 5))
+        surface.blit(self.legend, (self.rect.x + 5, self.rect.bottom))
+        return self.rect.union(Rect(self.rect.x + 5, self.rect.bottom, self.legend.get_width(), self.legend.get_height()))
+
+    def dumpCSV(self, fileName = None):
+        '''
+        Saves every frame in the buffer to a CSV file (times in milliseconds) and returns its name
+        '''
+        if fileName is None:
+            fileName = strftime("profile-%Y%m%d-%H%M%S.csv")
+        with open(fileName, "w", newline = "") as csvFile:
+            writer = csv.writer(csvFile)
+            writer.writerow(["frame"] + [phase + "_ms" for phase in PHASES] + ["total_ms"] + COUNTNAMES)
+            for f in self.order():
+                times = [t / 1e6 for t in self.times[f]]
+                writer.writerow([self.frameNumbers[f]] + [f"{t:.4f}" for t in times] + [f"{sum(times):.4f}"] + self.counts[f])
+        return fileName
@@ -0,0 +1,1395 @@
+# Simulation.py
+'''
+The gameplay part of the game, without anything that draws to the screen. All the state of a run (the player, platforms, tokens, obstacles, TNT, scrolling, altitude,
+lives/jumps/stars and the difficulty settings) is kept in a GameState object, which is moved forward one frame at a time with step(inputs).
+Nothing in here opens a window or waits on a clock, so a game can be run as fast as the computer allows (for soak tests, balancing and CI) with:
+    python Simulation.py [easy|normal|hard] [frames] [arrays] [chunks] [autoplay]
+A recorded game (see packReplay, and "python Game.py record") can be played back exactly with:
+    python Simulation.py replay <file> [arrays]
+Game.py uses the same GameState for the real game, stepping it FPS times a second of real time and drawing it as often as the screen allows.
+'''
+
+# importing libraries
+import hashlib
+import json
+import os
+import struct
+import sys
+import zlib
+from pygame import *
+from bisect import bisect_right
+from math import *
+from random import *
+from time import perf_counter, perf_counter_ns
+
+vec = math.Vector2
+
+# setting constants
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+
+WIDTH = 600    # width and height of screen
+HEIGHT = 700
+PLATWIDTH = 20    # thickness of platforms
+FPS = 60
+
+MAXDIST = 300
+WRAPRIGHT = WIDTH + 40    # how far the player goes to come back to the same place going off the right side of the screen (it comes back in at -40)
+WRAPLEFT = WIDTH + 57    # and going off the left side (it comes back in at WIDTH once all of it is off the screen)
+MINPLATMOVE = 80    # minimum range that a moving platform can move around in
+
+LASERENDWIDTH = 40    # size of the sprites at the ends of a laser, used for their rects
+LASERENDHEIGHT = 10
+
+# constants to make it easier to keep track of types of things
+NORMAL = 0
+BREAK = 1
+MOVE = 2
+
+JUMP = 0
+STAR = 1
+JETPACK = 2
+
+SPIKE = 0
+LASER = 1
+
+X = 0
+Y = 1
+
+# bits of a frame's inputs in a replay
+LEFTBIT = 1
+RIGHTBIT = 2
+SPACEBIT = 4
+SPACEUPBIT = 8
+
+REPLAYMAGIC = b"FSER"    # the start of every replay file
+REPLAYVERSION = 6    # changes whenever the same seed and inputs would play out differently, or the file changes
+REPLAYHEADER = struct.Struct("<BIBBII")    # version, seed, whether it used chunks, length of the difficulty's name, score, the frame the game ended on
+
+maxDist = 200
+minDist = 100    # minimum distance that can be present between platforms
+
+PLACEMENTTRIES = 8    # the most heights that are tried when placing a platform before giving up
+MAXRISE = 700    # higher than a double jump can go, the top of the jump tables
+LOWESTDROP = -HEIGHT    # the lowest a platform can be below the player's feet and still be in the jump tables
+REACHSLACK = 40    # how much lower than the highest platform a jump can land on the platforms of a reachable game are put, so the jump doesn't have to be perfect
+
+PROFILEFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "difficulties.json")    # the settings of every difficulty
+# the settings that every difficulty in the file has
+PROFILEFIELDS = ["normalChance", "breakChance", "movingChance", "TNTChance", "jumpChance", "starChance", "jetpackChance", "spikeChance", "laserChance",
+                 "spikeHeight", "laserWidth", "startingScroll", "genSpeed", "reachable"]
+
+GRIDCELL = 100    # size of the cells in the platform grid - the same as minDist so that a distance check only needs the neighbouring cells
+
+PLATLENGTHS = [40, 50, 70]    # the lengths of platform, in the order of the "length" passed to Platform
+THEMES = ["grass", "space"]
+
+# the first of the short/medium/long platform sprites for each theme and mode (in the order of platSprites in Assets.py) - moving platforms look like normal ones
+PLATSPRITES = {("grass", NORMAL): 0, ("space", NORMAL): 3, ("space", BREAK): 6, ("grass", BREAK): 9}
+GRASSOFFSETS = [0, -10, -15]    # how far up the grass sprites are drawn for each length, so the player stands on the surface of the grass
+
+
+# classes
+class Inputs():
+    '''
+    The inputs the player gave in one frame: whether left or right are held, and whether space was pressed or released
+    '''
+    def __init__(self, left = False, right = False, space = False, spaceUp = False):
+        self.left = left
+        self.right = right
+        self.space = space    # space was pressed this frame
+        self.spaceUp = spaceUp    # space was released this frame
+
+    def bits(self):
+        # the inputs packed into one number, for recording them
+        bits = 0
+        if self.left:
+            bits |= LEFTBIT
+        if self.right:
+            bits |= RIGHTBIT
+        if self.space:
+            bits |= SPACEBIT
+        if self.spaceUp:
+            bits |= SPACEUPBIT
+        return bits
+
+
+def inputsFromBits(bits):
+    # the opposite of Inputs.bits()
+    return Inputs(bits & LEFTBIT != 0, bits & RIGHTBIT != 0, bits & SPACEBIT != 0, bits & SPACEUPBIT != 0)
+
+
+class Player():
+    '''
+    Stores all the information about the player that the user controls. Also has the functions that directly affect the player: moving/updating the player's position, jumping, canceling jumps, jetpacking, and invincibility frames
+    '''
+    __slots__ = ["pos", "vel", "acc", "rect", "facing", "invincible", "invincibleTime", "jumping", "maxSpeed", "collision", "available", "jetpack", "jetpackTime", "TNTed"]
+
+    def __init__(self, pos, rect, rng):
+        # initializes variables
+        self.pos = pos
+        self.vel = vec(0, 0)    # player's velocity
+        self.acc = vec(0, 0)    # player's acceleration
+        self.rect = rect
+        self.facing = "R"    # the direction that the player is facing, used to draw the player sprite in the corresponding direction
+        self.invincible = False    # controls if the player is affected by obstacles, activates if the player is hit
+        self.invincibleTime = 1 * FPS    # the amount of time that the player is invincible for
+        self.jumping = False    # whether the player is jumping or not
+        self.maxSpeed = 10    # speed of player's horizontal movement
+        self.collision = False
+        self.available = 1    # whether the player has already double jumped or not in a jump
+        self.jetpack = False    # whether or not the player is in the jetpack state
+        self.jetpackTime = rng.randint(2, 3) * FPS    # the amount of time the player has in the jetpack state
+        self.TNTed = False    # whether the player has been launched by TNT
+
+
+    def move(self, inputs):
+        '''
+        Changes the player's position based on the preset gravity and the user's inputs
+        Referenced from https://coderslegacy.com/python/pygame-gravity-and-jumping/
+        '''
+
+        self.acc.update(0, 0.9)    # 0.9 creates gravity by constantly increasing the player's downward velocity
+        self.vel.x = 0    # resets the player's horizontal velocity to 0 so that the player can stop after moving
+
+        # changes the player's horizontal velocity
+        if inputs.left:
+            self.vel.x = -self.maxSpeed
+            self.facing = "L"
+        elif inputs.right:
+            self.vel.x = self.maxSpeed
+            self.facing = "R"
+
+        # updating the player's position based  on the current speed
+        self.vel += self.acc    # in place, so no new vectors are made every frame
+        self.pos[1] += self.vel.y
+        self.pos[0] += self.vel.x
+        self.rect[0] = self.pos[0]
+        self.rect[1] = self.pos[1]    # updates the player's rect to match the position
+
+        # teleports the player to the other side of the screen if they go off from the side
+        if self.rect.left >= WIDTH:
+            self.pos[X] = -40
+        if self.rect.right <= 0:
+            self.pos[X] = WIDTH
+
+    def playerJump(self, jumps):
+        '''
+        Makes the player jump or double jump when called. "jumps" is how many double jumps the player has, and how many are left afterwards is returned
+        '''
+
+        self.jumping = True
+        if self.vel.y != 0:    # if the player is currently in the air
+            if jumps > 0:
+                if self.available:    # if the player has not already double jumped
+                    jumps -= 1
+                    self.available = 0
+                    self.vel.y = -24
+
+        if self.vel.y == 0:
+            self.vel.y = -24    # increases the upward velocity, resulting in a jump
+        return jumps
+
+    def jumpCancel(self):
+        '''
+        Cancels a jump early if the spacebar is released
+        '''
+
+        if self.jumping:
+            if self.vel.y < -10:
+                self.vel.y = -10
+
+    def collide(self, plats):
+        '''
+        Controls what happens when a player collides with a platform
+        '''
+
+
+        self.collision = False
+        for plat in plats:
+            if plat.rect.colliderect(self.rect):
+                if self.vel.y > 0:
+                    if (self.rect.bottom >= plat.rect.top and self.rect.bottom < plat.rect.bottom) and self.rect.top < plat.rect.top:    # makes sure that the player only gets placed on top of the platform if it is entirely above the platform
+                        self.jumping = False
+                        self.collision = True
+                        self.vel.y = 0
+                        self.acc.y = 0    # gravity stops when the player is on a platform
+                        self.pos[Y] = plat.rect.top - self.rect[3] + 1    # places the player on the top of the platform so that they are not stuck in the platform
+                        self.available = 1    # the double jump is refreshed
+
+                        # makes the player move with a moving platform
+                        if plat.mode == MOVE:
+                            if plat.dir == "R":
+                                self.pos[X] += 2
+                            if plat.dir == "L":
+                                self.pos[X] -= 2
+
+    def jetpacking(self, game):
+        '''
+        Contols the player's movement when in the jetpacking state
+        '''
+
+        if self.jetpackTime > 0:
+            self.jetpackTime -= 1
+            self.vel.y = -20
+            self.acc.y = 0
+            game.scrollSpeed = -self.vel.y    # increases the scroll speed to that the screen follows the player
+
+            # gradually draws more platforms as the jetpacking state ends so that the player has platforms to stand on - reachable difficulties only
+            # need one at a time, since each is put within a jump of the one before it
+            bursts = {25: (3, -100), 15: (3, -100), 10: (5, -300)}    # frames left: (platforms, top of where they go)
+            if self.jetpackTime in bursts:
+                count, top = bursts[self.jetpackTime]
+                if game.profile.reachable:
+                    count = 1
+                for i in range(count):
+                    game.genPlat(top, -20)
+
+            if self.jetpackTime == 0:    # jetpack state ends
+                self.jetpack = False
+                self.jetpackTime = game.rng.randint(2, 3) * FPS    # resets the jetpack time
+                game.scrollSpeed = game.startingScroll
+
+    def invincibility(self):
+        '''
+        Makes the player uninvincible after some time so that the player has i-frames after touching an obstacle
+        '''
+
+        if self.invincible == True:
+            if self.invincibleTime > 0:
+                self.invincibleTime -= 1    # time starts counting down when invincibile is first set to true
+
+                if self.invincibleTime == 0:    # i-frames end
+                    self.invincible = False
+                    self.invincibleTime = 1 * FPS    # resets invincibility time
+
+
+
+
+class JumpArc():
+    '''
+    One kind of jump from standing on a platform: the height of the player's feet above where they started on every frame, and for every height a platform could
+    be at, the first frame that the player would land on it (None if it never would)
+    '''
+    __slots__ = ["cancel", "double", "heights", "landing"]
+
+    def __init__(self, cancel = None, double = None):
+        self.cancel = cancel    # the frame that the jump is cancelled on, or None
+        self.double = double    # the frame that the double jump is made on, or None
+
+        # moves a real player with no platforms around it, jumping on frame 0
+        jumps = 1    # enough for the double jump
+        player = Player([0, 0], Rect(0, 0, 57, 81), Random(0))
+        start = player.rect.bottom
+        self.heights = []
+        self.landing = [None] * (MAXRISE - LOWESTDROP + 1)
+        frame = 0
+        while not self.heights or self.heights[-1] > LOWESTDROP - PLATWIDTH:
+            if frame == 0 or frame == double:
+                jumps = player.playerJump(jumps)
+            if frame == cancel:
+                player.jumpCancel()
+            player.move(Inputs())
+            height = start - player.rect.bottom
+            self.heights.append(height)
+
+            # the player lands on a platform when they are moving down and their feet are in the top of it (Player.collide)
+            if player.vel.y > 0:
+                for rise in range(max(height, LOWESTDROP), min(height + PLATWIDTH, MAXRISE + 1)):
+                    if self.landing[rise - LOWESTDROP] is None:
+                        self.landing[rise - LOWESTDROP] = frame
+            frame += 1
+
+    def landingFrame(self, rise):
+        # the frame that the player lands on a platform "rise" pixels above their feet, or None
+        if rise < LOWESTDROP or rise > MAXRISE:
+            return None
+        return self.landing[rise - LOWESTDROP]
+
+
+class WeightTable():
+    '''
+    Picks one of a few outcomes, each with a whole-number chance out of "total" - whatever is left over picks "rest". The chances are added up once, so
+    picking is one random number and a binary search however many outcomes there are
+    '''
+    __slots__ = ["outcomes", "cumulative", "total"]
+
+    def __init__(self, chances, rest = None, total = 100):
+        self.outcomes = []
+        self.cumulative = []    # the running total of the chances, the first number that picks the next outcome
+        self.total = total
+        running = 0
+        for outcome, chance in chances:
+            if chance > 0:
+                running += chance
+                self.outcomes.append(outcome)
+                self.cumulative.append(running)
+        if running > total:
+            raise ValueError(f"the chances add up to {running}, more than {total}")
+        self.outcomes.append(rest)
+
+    def pick(self, rng):
+        return self.outcomes[bisect_right(self.cumulative, rng.randrange(self.total))]
+
+
+class DifficultyProfile():
+    '''
+    The settings of one difficulty from difficulties.json, with the chances of each kind of platform, token and obstacle made into WeightTables.
+    A profile can't be changed once it is made (replace() makes a changed copy instead), so one profile can be shared by every game of that difficulty and by the
+    chunk worker
+    '''
+    __slots__ = PROFILEFIELDS + ["name", "platforms", "tokens", "obstacles"]
+
+    def __init__(self, name, settings):
+        for field in PROFILEFIELDS:
+            if field not in settings:
+                raise ValueError(f"difficulty {name} has no {field}")
+            object.__setattr__(self, field, settings[field])
+        for field in settings:
+            if field not in PROFILEFIELDS:
+                raise ValueError(f"difficulty {name} has an unknown setting {field}")
+        object.__setattr__(self, "name", name)
+
+        # whole-number chances out of 100, and if they don't add up to 100 the rest is nothing
+        object.__setattr__(self, "platforms", WeightTable([(NORMAL, self.normalChance), (BREAK, self.breakChance), (MOVE, self.movingChance)]))
+        object.__setattr__(self, "tokens", WeightTable([("TNT", self.TNTChance), ("jump", self.jumpChance), ("star", self.starChance), ("jetpack", self.jetpackChance)], "none"))
+        object.__setattr__(self, "obstacles", WeightTable([("spike", self.spikeChance), ("laser", self.laserChance)], "none"))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("a difficulty profile can't be changed, use replace() to make a changed copy")
+
+    def replace(self, **changes):
+        # a copy of the profile with some of the settings changed
+        settings = {field: getattr(self, field) for field in PROFILEFIELDS}
+        settings.update(changes)
+        return DifficultyProfile(self.name, settings)
+
+
+def loadProfiles(fileName = PROFILEFILE):
+    '''
+    Returns {difficulty: DifficultyProfile} for every difficulty in the file, so a new difficulty can be added to the file without changing the code
+    '''
+    with open(fileName) as profileFile:
+        settings = json.load(profileFile)
+    return {name: DifficultyProfile(name, settings[name]) for name in settings}
+
+
+profiles = loadProfiles()
+
+
+class Archetype():
+    '''
+    Everything about a platform that only depends on its length, theme and mode: its size, which sprite it uses, how far up the sprite is drawn and which spike
+    sprite goes on it. There is one for each combination in the archetypes table, and every platform keeps the one it was made with
+    '''
+    __slots__ = ["length", "spriteType", "mode", "size", "sprite", "drawOffset", "spikeSprite", "image"]
+
+    def __init__(self, length, spriteType, mode):
+        self.length = PLATLENGTHS[length]
+        self.spriteType = spriteType
+        self.mode = mode
+        self.size = (self.length, PLATWIDTH)    # the size of the platform's rect
+        if mode == BREAK:
+            self.sprite = PLATSPRITES[(spriteType, BREAK)] + length
+        else:
+            self.sprite = PLATSPRITES[(spriteType, NORMAL)] + length
+
+        self.drawOffset = 0
+        if spriteType == "grass" and mode != BREAK:
+            self.drawOffset = GRASSOFFSETS[length]
+        self.spikeSprite = 1 + length    # spikeShort, spikeMed or spikeLong in obsSprites
+        self.image = None    # the sprite's surface, set by Game.py once the sprites are loaded
+
+
+def makeArchetypes():
+    # the table of every archetype: {(length, theme, mode): Archetype}
+    table = {}
+    for length in range(len(PLATLENGTHS)):
+        for spriteType in THEMES:
+            for mode in [NORMAL, BREAK, MOVE]:
+                table[(length, spriteType, mode)] = Archetype(length, spriteType, mode)
+    return table
+
+
+archetypes = makeArchetypes()
+
+
+class Platform():
+    '''
+    Contains the information about a platform: the type/mode, position, rect, sprite, objects on it, etc.
+    '''
+    __slots__ = ["rect", "pos", "mode", "spriteType", "archetype", "length", "sprite", "attribute", "obstacle", "dead", "colour", "visible", "timer", "setTimer", "valid",
+                 "startPos", "endPos", "pathRect", "dir", "row"]
+
+    def __init__(self, rect, mode, length, spriteType, game, endX = None):
+        # initialize variables
+        self.rect = rect
+        self.pos = [self.rect[0], self.rect[1]]
+        self.mode = mode    # the type of platform: normal, breakable, or moving
+        self.spriteType = spriteType    # which theme the sprite will be: "grass" - grassy or "space" - futuristic
+
+        # the length (one of three) and the sprite come from the platform's archetype
+        self.archetype = archetypes[(length, spriteType, mode)]
+        self.length = self.archetype.length
+        self.sprite = self.archetype.sprite
+
+        # whether this platform will have any extra objects on it and what kind they will be
+        self.attribute = "none"
+        self.obstacle = "none"
+        self.dead = False    # set when the platform is removed from the game
+
+        if self.mode != MOVE:   # so that moving platforms will not have objects or obstacles on it
+            self.obstacle = game.profile.obstacles.pick(game.rng)
+            self.attribute = game.profile.tokens.pick(game.rng)
+
+        # set some attributes based on the platform's type
+        if self.mode == NORMAL:
+            self.colour = GREEN
+        if self.mode == BREAK:
+            self.colour = RED
+            self.visible = True   # whether the platform has been broken or not
+            self.timer = 10
+            self.setTimer = False    # sets a timer for the platform to disappear after the player goes on it
+        if self.mode == MOVE:
+            self.valid = True    # if the platform is one that can exist
+            self.colour = (0, 255, 255)
+            self.startPos = (self.pos[X], self.pos[Y])    # the position that the platform starts in
+
+            if endX is not None:    # the end of the path was already picked when the platform was placed
+                self.endPos = (endX, self.pos[Y])
+                self.pathRect = Rect(self.startPos[X], self.startPos[Y], self.endPos[X] - self.startPos[X] + self.rect[2], self.rect[3])
+            elif self.pos[X] + MINPLATMOVE < WIDTH - self.rect[2]:
+                self.endPos = (game.rng.randint(self.pos[X] + MINPLATMOVE, WIDTH - self.rect[2]), self.pos[Y])    # the point at which the platform switches directions - "WIDTH - self.rect[2]" guarantees that it will be on the screen
+                self.pathRect = Rect(self.startPos[X], self.startPos[Y], self.endPos[X] - self.startPos[X] + self.rect[2], self.rect[3])    # a Rect that represents the path that the platform will take - all possible positions of the platform
+            else:
+                self.valid = False
+
+            self.dir = "R"    # current moving direction of the platform
+
+
+    def breakMode(self, player):
+        '''
+        Controls the breaking of breakable platforms
+        '''
+
+        if self.visible:
+            if player.collision:    # only copies the player's rect when they are standing on something
+                nonCorrected = player.rect.copy()    # the position of the player when colliding with a platform, before it is placed on top of the plaforms
+                nonCorrected[Y] += 1
+                if nonCorrected.colliderect(self.rect):
+                    self.setTimer = True
+
+            if self.setTimer:
+                self.timer -= 1
+            if self.timer == 0:
+                self.visible = False
+
+    def moveMode(self):
+        '''
+        Controls the movement of moving platforms
+        '''
+
+        if self.dir == "R":
+            self.rect[X] += 2
+            self.pos[X] = self.pos[X] + 2
+        if self.dir == "L":
+            self.rect[X] -= 2
+            self.pos[X] = self.pos[X] - 2
+        # switches directions
+        if self.rect[X] >= self.endPos[X]:
+            self.dir = "L"
+        if self.rect[X] <= self.startPos[X]:
+            self.dir = "R"
+
+    def pathUpdate(self):
+        # updates the position of the path rect based on the current position of the plaform
+        self.pathRect[1] = self.rect[1]
+
+
+
+class TNT():
+    '''
+    Contains all the information about a TNT: the platform it is on, its position/rect, etc.
+    Has function explode()
+    '''
+    __slots__ = ["plat", "pos", "rect", "exploded", "dead", "row"]
+
+    def __init__(self, plat, game):
+        self.plat = plat
+        if self.plat.obstacle == "spike":    # raises TNT placement to not overlap with spikes
+            self.pos = (game.rng.randint(plat.rect.left, plat.rect.right - 20), plat.rect.top - 40 - game.spikeHeight - 10)
+        else:
+            self.pos = (game.rng.randint(plat.rect.left, plat.rect.right - 20), plat.rect.top - 40)
+        self.rect = Rect(self.pos[0], self.pos[1], 30, 40)
+        self.exploded = False    # whether the TNT has been collided with yet
+        self.dead = False
+
+    def explode(self, game):
+        '''
+        Deletes the TNT and platforms below it and launches th player - only called for TNT that the player is touching
+        '''
+        player = game.player
+
+        game.sync()    # the positions of all the platforms are needed
+        self.exploded = True
+        player.TNTed = True
+        player.jumping = False
+        for plat in game.platforms:
+            if plat.rect[1] >= self.rect.bottom:    # removes the platforms below the TNT
+                game.removePlat(plat)
+
+        player.vel.y = -40    # increases the upwards velocity of the player by a large amount
+
+class Token():
+    '''
+    Contains information about a token object: the platform its on, the kind of token it is, etc.
+    '''
+    __slots__ = ["plat", "pos", "rect", "mode", "gone", "dead", "colour", "row"]
+
+    def __init__(self, plat, mode, game):
+        size = 30
+        self.plat = plat
+        if self.plat.obstacle == "none" or self.plat.obstacle == "laser":
+            self.pos = (self.plat.rect[0] + self.plat.rect[3]/2, self.plat.rect.top - size - 10)
+            self.rect = Rect(self.pos[X], self.pos[Y], size, size)
+        if self.plat.obstacle == "spike":    # raises token placement to not overlap with spikes
+            self.pos = (self.plat.rect[0] + self.plat.rect[3]/2, self.plat.rect.top - size - game.spikeHeight - 10)
+            self.rect = Rect(self.pos[X], self.pos[Y], size, size)
+
+        self.mode = mode
+
+        self.gone = False    # sets to true when the token is collided with - it is consumed
+        self.dead = False
+
+        if self.mode == JUMP:
+            self.colour = (255, 255, 255)
+        if self.mode == STAR:
+            self.colour = (255, 255, 0)
+        if self.mode == JETPACK:
+            self.colour = (0, 0, 255)
+
+    # following functions perform similar functions: setting the token to "gone", removing it and triggering the respective events - they are only called
+    # for tokens that the player is touching
+    def doubJumpTok(self, game):
+        # double jump token
+        if game.jumps < 3:
+            game.jumps += 1
+        self.gone = True
+        game.tokenList.kill(self)
+
+    def starTok(self, game):
+        if game.stars < 8:
+            game.stars += 1
+        self.gone = True
+        game.tokenList.kill(self)
+
+    def jetpackTok(self, game):
+        game.player.jetpack = True    # starts the jetpack state
+        self.gone = True
+        game.tokenList.kill(self)
+
+
+class Obs():
+    '''
+    Contains information about obstacles: the platform it is on, the type of obstacle, sprite, etc.
+    '''
+    __slots__ = ["plat", "mode", "dead", "rect", "colour", "sprite", "endPoint", "topSpriteRect", "bottomSpriteRect", "row"]
+
+    def __init__(self, plat, mode, game):
+        self.plat = plat
+        self.mode = mode
+        self.dead = False
+
+        if self.mode == SPIKE:
+            self.rect = Rect(self.plat.rect[X], self.plat.rect[Y] - game.spikeHeight, self.plat.length, game.spikeHeight)    # length of spikes depends on length of platform
+            self.colour = (128, 128, 0)
+
+            self.sprite = plat.archetype.spikeSprite    # sprite of spike (in the order of obsSprites in Assets.py) based on platform length
+
+        if self.mode == LASER:
+            self.endPoint = game.rng.randint(100, 500)    # random point for the laser to end
+            self.rect = Rect(self.plat.rect.center[X], self.plat.rect.top - self.endPoint, game.laserWidth, self.endPoint)
+            self.colour = (255, 0, 0)
+            # rects for the sprites at the top and bottom of the lasers
+            self.topSpriteRect = Rect(self.rect[0] - LASERENDWIDTH/2 + 5, self.rect.top - 4, LASERENDWIDTH, LASERENDHEIGHT)
+            self.bottomSpriteRect = Rect(self.rect[0] - LASERENDWIDTH/2 + 5, self.rect.bottom - LASERENDHEIGHT, LASERENDWIDTH, LASERENDHEIGHT)
+
+    def obsCollide(self, game):
+        '''
+        Reduce the lives by one when the player collides with an obstacle - only called for obstacles that the player is touching
+        '''
+        player = game.player
+        if player.invincible == False:    # only triggers if player is not invicible
+            game.hit = True    # the screen flashes red for this frame
+            if game.lives > 0:
+                game.lives -= 1
+            player.invincible = True    # invincible state begins
+
+    def laserUpdate(self):
+        '''
+        Updates the opsition of the top and bottom sprites for the lasers
+        '''
+        self.topSpriteRect[Y] = self.rect.top - 4
+        self.bottomSpriteRect[Y] = self.rect.bottom - LASERENDHEIGHT
+
+
+class EntityList(list):
+    '''
+    A list of game objects where removing one only tags it as dead, which takes constant time no matter how long the list is.
+    All the dead objects are taken out together in one pass by compact(), which is called once at the end of each frame, so the order of the rest stays the same.
+    If the list has a Pool, the objects taken out are given to it to be reused.
+    The list also keeps the objects' rects in the same order in self.rects, so collisions with all of them can be found with one collidelistall() - objects have to
+    keep the same Rect (moving it in place) while they are in the list
+    '''
+    def __init__(self, objects = (), pool = None):
+        list.__init__(self, objects)
+        self.rects = [obj.rect for obj in self]
+        self.deadCount = 0    # how many objects have been tagged since the last compact()
+        self.onKill = None    # function that is called with each object as it is tagged, used by the array backend
+        self.pool = pool
+
+    def append(self, obj):
+        list.append(self, obj)
+        self.rects.append(obj.rect)
+
+    def kill(self, obj):
+        # tags an object to be removed - tagging one that is already dead does nothing
+        if not obj.dead:
+            obj.dead = True
+            self.deadCount += 1
+            if self.onKill:
+                self.onKill(obj)
+
+    def compact(self):
+        # removes all the tagged objects, keeping the same list so that anything holding it still sees the change
+        if self.deadCount > 0:
+            if self.pool is not None:
+                self.pool.release([obj for obj in self if obj.dead])
+            self[:] = [obj for obj in self if not obj.dead]
+            self.rects = [obj.rect for obj in self]
+            self.deadCount = 0
+
+
+class Pool():
+    '''
+    A free list for one kind of game object. make() sets up an object that was removed from the game again with __init__ instead of making a new one, so a long game
+    doesn't keep making and throwing away objects.
+    Removed objects wait until the next release() before they are reused, since some things still look at an object for a frame after it is removed (an obstacle
+    checks whether its platform is dead, and the array backend keeps lists of breaking platforms)
+    '''
+    def __init__(self, kind):
+        self.kind = kind    # the class of the objects
+        self.free = []
+        self.waiting = []    # the objects from the last release()
+
+    def make(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.__init__(*args)
+            return obj
+        return self.kind(*args)
+
+    def release(self, objects):
+        self.free.extend(self.waiting)
+        self.waiting = objects
+
+
+class PlatGrid():
+    '''
+    A uniform grid of the platforms so that placing a new platform only has to look at the platforms near it instead of all of them.
+    The cells are in "world" coordinates (the screen position minus how far the screen has scrolled), so scrolling only changes the offset and no platform has to be moved between cells.
+    Moving platforms are put in every cell that their pathRect covers, since they can be anywhere on their path
+    '''
+    def __init__(self):
+        self.offset = 0    # the total distance that the screen has scrolled
+        self.cells = {}    # (column, row): the set of platforms in that cell
+        self.platCells = {}    # platform: the cells that it was put in
+
+    def cellRange(self, rect, margin):
+        # returns the cells covered by a rect grown by "margin" on each side
+        left = floor((rect.left - margin) / GRIDCELL)
+        right = floor((rect.right + margin) / GRIDCELL)
+        top = floor((rect.top - self.offset - margin) / GRIDCELL)
+        bottom = floor((rect.bottom - self.offset + margin) / GRIDCELL)
+        return [(col, row) for col in range(left, right + 1) for row in range(top, bottom + 1)]
+
+    def add(self, plat):
+        # puts a platform into the cells that it covers
+        if plat.mode == MOVE:
+            covered = self.cellRange(plat.pathRect, 0)
+        else:
+            covered = self.cellRange(plat.rect, 0)
+
+        for cell in covered:
+            if cell not in self.cells:
+                self.cells[cell] = set()
+            self.cells[cell].add(plat)
+        self.platCells[plat] = covered
+
+    def remove(self, plat):
+        # takes a platform out of the grid, does nothing for things that were never added
+        for cell in self.platCells.pop(plat, ()):
+            self.cells[cell].discard(plat)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def scroll(self, distance):
+        # the platforms moved down by "distance" on the screen
+        self.offset += distance
+
+    def near(self, rect):
+        '''
+        Returns the platforms that could collide with or be closer than minDist to a platform anywhere in "rect"
+        '''
+        # the extra 2 pixels cover rects being rounded differently when they scroll
+        found = set()
+        for cell in self.cellRange(rect, minDist + 2):
+            if cell in self.cells:
+                found.update(self.cells[cell])
+        return found
+
+
+class Placement():
+    '''
+    Picking what kind of platform comes next and finding a free place for it. GameState and the ChunkGenerator in Chunks.py both use it;
+    they need a PlatGrid in self.grid, a Random in self.rng and a DifficultyProfile in self.profile, and for reachable difficulties the frontier in self.frontierTop
+    '''
+    spotTries = 0    # how many heights findSpot() has tried and how many places it found, for measuring how crowded the generation is (see Tuning.py)
+    spotsFound = 0
+
+    def rollPlatform(self, altitude):
+        '''
+        Returns (mode, length, rect length, theme) for a new platform, or None when no platform should be made this time
+        '''
+        mode = self.profile.platforms.pick(self.rng)    # the type of platform, or None for no platform this time
+        if altitude < 14000:
+            spriteType = "grass"
+        if altitude >= 14000:
+            spriteType = "space"
+
+        length = self.rng.randint(0, 2)    # determines the length of platform it will be
+        if mode is None:
+            return None
+        rectLength = archetypes[(length, spriteType, mode)].size[0]    # the width of the platform's rect
+        return mode, length, rectLength, spriteType
+
+    def freeSpans(self, y, length, mode):
+        '''
+        Returns the spans [first x, last x] where a platform of "length" at height y would be at least minDist from every other platform and not collide with
+        any of them or their paths. A moving platform is checked as if it had the shortest path it can have, MINPLATMOVE.
+        Everything is whole numbers, so the spans are exactly the places the old check (colliding rects and the distance between corners) would allow
+        '''
+        if mode == MOVE:
+            lastX = WIDTH - length - MINPLATMOVE - 1    # moving platforms need room to move on the screen
+            checkLength = length + MINPLATMOVE
+        else:
+            lastX = WIDTH
+            checkLength = length
+        if lastX < 0:
+            return []
+
+        blocked = []
+        for plat in self.grid.near(Rect(0, y, WIDTH + checkLength, PLATWIDTH)):
+            # too close: the corners are less than minDist apart, which is every x within "reach" of the other platform's x
+            dy = plat.rect[Y] - y
+            if dy*dy < minDist*minDist:
+                reach = isqrt(minDist*minDist - dy*dy - 1)
+                blocked.append((plat.rect[X] - reach, plat.rect[X] + reach))
+
+            # colliding with the platform, or with where it moves
+            rects = [plat.rect]
+            if plat.mode == MOVE:
+                rects.append(plat.pathRect)
+            for rect in rects:
+                if y < rect.bottom and y + PLATWIDTH > rect.top:
+                    blocked.append((rect.left - checkLength + 1, rect.right - 1))
+
+        # takes the blocked parts out of [0, lastX]
+        spans = []
+        x = 0
+        for start, end in sorted(blocked):
+            if start > x:
+                spans.append([x, min(start - 1, lastX)])
+            x = max(x, end + 1)
+            if x > lastX:
+                break
+        if x <= lastX:
+            spans.append([x, lastX])
+        return [span for span in spans if span[0] <= span[1]]
+
+    def pathEnd(self, x, y, length):
+        # the furthest right a moving platform starting at x can go before its path hits something
+        end = WIDTH - length
+        for plat in self.grid.near(Rect(x, y, WIDTH - x, PLATWIDTH)):
+            rects = [plat.rect]
+            if plat.mode == MOVE:
+                rects.append(plat.pathRect)
+            for rect in rects:
+                if y < rect.bottom and y + PLATWIDTH > rect.top and rect.left >= x + length + MINPLATMOVE:
+                    end = min(end, rect.left - length)
+        return end
+
+    def reachBand(self, range1, range2, climb):
+        '''
+        For a reachable difficulty, narrows the heights range1 to range2 down to the ones that can be jumped to from the frontier: the highest platform that there is a
+        way up to from the ground, kept in world coordinates in self.frontierTop. With "climb" the platform is put a quarter to half of the highest jump above the
+        frontier, for making an easy way up through a gap. If the whole band is too high to reach, the platform becomes a link a quarter to a whole jump above the
+        frontier instead, below the band, so the way up is never broken - or None if that would be below the bottom of the screen, where it would be gone straight away
+        '''
+        frontier = floor(self.frontierTop + self.grid.offset)    # on the screen
+        low = max(range1, frontier - REACHRISE)
+        high = range2
+        if climb:
+            low = max(low, frontier - REACHRISE // 2)
+            high = min(high, frontier - REACHRISE // 4)
+        if low > high:
+            if frontier - REACHRISE // 4 > HEIGHT:
+                return None
+            return frontier - REACHRISE, frontier - REACHRISE // 4
+        return low, high
+
+    def bridging(self, top):
+        # whether the frontier is still too far below "top" to climb from, so the next platform should be put above it
+        return self.frontierTop + self.grid.offset - REACHRISE // 4 >= top
+
+    def findSpot(self, range1, range2, length, mode, climb = False):
+        '''
+        Picks a place for a new platform between the heights range1 and range2: a random height, then a random x out of the free spans at that height.
+        Only PLACEMENTTRIES heights are tried, so this always takes about the same time; returns (x, y, end of the path for moving platforms) or None if the band is full.
+        For a reachable difficulty the band is narrowed with reachBand() first, and a platform above the frontier that can't break and that can be jumped to from it
+        becomes the new frontier
+        '''
+        if self.profile.reachable:
+            band = self.reachBand(range1, range2, climb)
+            if band is None:
+                return None
+            range1, range2 = band
+        for i in range(PLACEMENTTRIES):
+            self.spotTries += 1
+            y = self.rng.randint(range1, range2)
+            spans = self.freeSpans(y, length, mode)
+            free = sum(end - start + 1 for start, end in spans)
+            if free == 0:
+                continue
+
+            pick = self.rng.randrange(free)    # every free x is as likely as the others
+            for start, end in spans:
+                if pick <= end - start:
+                    x = start + pick
+                    break
+                pick -= end - start + 1
+
+            endX = None
+            if mode == MOVE:
+                endX = self.rng.randint(x + MINPLATMOVE, self.pathEnd(x, y, length))
+            self.spotsFound += 1
+            # breakable platforms are gone once they have been stood on, so they can't be part of the way up
+            if self.profile.reachable and mode != BREAK and y - self.grid.offset >= self.frontierTop - REACHRISE:
+                self.frontierTop = min(self.frontierTop, y - self.grid.offset)    # it can be jumped to from the frontier, so there is a way up to it
+            return x, y, endX
+
+        return None
+
+
+class GameState(Placement):
+    '''
+    Everything about one run of the game: the player, the lists of game objects, scrolling, altitude, lives/jumps/stars and the settings of the chosen difficulty.
+    step() moves the game forward by one frame without drawing anything. "profile" plays a changed copy of the difficulty's profile instead of the one in the file
+    '''
+    def __init__(self, gameMode, seed = None, chunked = False, profile = None):
+        self.gameMode = gameMode
+        if profile is None:
+            if gameMode not in profiles:
+                raise ValueError(f"there is no difficulty called {gameMode} in {PROFILEFILE}")
+            profile = profiles[gameMode]
+        self.profile = profile    # the chances of each kind of platform, token and obstacle
+
+        # everything random in a game comes from its own generator, so the same seed and inputs always play out the same way
+        if seed is None:
+            seed = randrange(2**32)
+        self.seed = seed
+        self.rng = Random(seed)
+        self.inputLog = bytearray()    # the inputs of every frame as bits, which with the seed is enough to replay the game
+        self.profiler = None    # if set, profiler.add(phase, nanoseconds) is called with how long each part of a frame took
+
+        # setting the starting conditions of the game
+        self.jumps = 3
+        self.stars = 0
+        self.lives = 5
+
+        # the sizes of obstacles and the speeds from the difficulty's profile
+        self.spikeHeight = profile.spikeHeight
+        self.laserWidth = profile.laserWidth
+        self.startingScroll = profile.startingScroll     # the base scrolling speed
+        self.genSpeed = profile.genSpeed    # the speed that the platforms that are generated at
+
+        self.scrollSpeed = self.startingScroll
+
+        self.frames = 0     # the number of frames that have passed
+        self.altitude = 0    # the distance that the screen has moves since the game started
+        self.timer = 0
+        self.over = False    # set to True when the player loses
+        self.hit = False    # whether the player hit an obstacle this frame
+        self.lastScroll = 0    # how far everything scrolled last frame, not counting re-centering, so a drawing can be put partway between two frames
+
+        self.player = Player([200, 400], Rect(200, 400, 57, 81), self.rng)    # player object that is what the user controls
+        self.lastPlayerPos = [200, 400]    # where the player was at the start of the last frame, moved along with any re-centering
+        ground = Platform(Rect(200, 500, 70, 35), NORMAL, 2, "grass", self)    # starting platform that the player spawns on
+        ground.attribute = "none"    # setting the base platform to not having anything on it
+        ground.obstacle = "none"
+        self.platforms = EntityList(pool = Pool(Platform))    # list that stores all platforms that will be drawn to the screen
+        self.grid = PlatGrid()    # the platforms sorted by where they are, for checking where new platforms can go
+
+        self.TNTList = EntityList(pool = Pool(TNT))    # list for all the TNT objects
+        self.tokenList = EntityList(pool = Pool(Token))    # list for all the token objects
+        self.obsList = EntityList(pool = Pool(Obs))    # list for all the obstacles
+        self.listList = [self.platforms, self.TNTList, self.tokenList, self.obsList]    # list for all the main lists that are drawn
+
+        self.chunks = None    # the ChunkGenerator, for games where the level is made ahead on a worker thread
+        self.chunked = chunked
+        self.addPlat(ground)
+        self.frontierTop = ground.rect.top    # the highest platform there is a way up to, in world coordinates (only used by reachable difficulties)
+
+        for i in range(9):    # generates starting platforms
+            self.genPlat(0, 500)
+
+        if chunked:
+            from Chunks import ChunkGenerator    # imported here since Chunks.py imports this file
+            self.chunks = ChunkGenerator(self)
+
+    def step(self, inputs):
+        '''
+        Moves the game forward by one frame using the player's inputs for that frame
+        '''
+        self.frames += 1
+        self.hit = False
+        self.inputLog.append(inputs.bits())
+        self.lastPlayerPos = [self.player.pos[X], self.player.pos[Y]]
+        start = perf_counter_ns()
+
+        self.scrollObjects()    # scrolling and removing things that went off the screen
+        start = self.lap("scroll", start)
+        self.generate()    # new platforms
+        start = self.lap("generate", start)
+        self.updatePlayer(inputs)
+        self.updateObjects()    # obstacles, tokens, platforms and TNT
+        start = self.lap("collide", start)
+        self.updateScore()
+
+        for lis in self.listList:    # takes everything that was removed this frame out of the lists in one go
+            lis.compact()
+        self.lap("score", start)
+
+    def lap(self, phase, start):
+        # gives the profiler the time since "start" for one part of a frame, and returns the time now for the next part to start from
+        now = perf_counter_ns()
+        if self.profiler is not None:
+            self.profiler.add(phase, now - start)
+        return now
+
+    def scrollObjects(self):
+        '''
+        Scrolls everything down by the scroll speed, removes what went off the screen and re-centers the screen if the player went off the top
+        '''
+        player = self.player
+
+        self.scrollAll(self.scrollSpeed)
+        self.lastScroll = self.scrollSpeed
+        self.cullAll()    # tags the objects that went off the screen
+
+        player.pos[Y] += self.scrollSpeed    # also scrolls the player
+        if self.profile.reachable:
+            self.raiseFrontier()
+
+        if player.pos[Y] <= -60:    # re-centers the screen if the player goes off from the top
+            for i in range(7):
+                if not self.profile.reachable:
+                    self.genPlat(-600, -300)    # generates more platforms so there is no big gap
+                elif self.bridging(-600):
+                    self.genPlat(-600, -20, True)    # only the platforms that make a way up through the gap, each a jump above the last
+
+            diff = HEIGHT/1.5 - player.pos[Y]
+            self.scrollAll(diff)
+            player.pos[Y] += diff
+            self.lastPlayerPos[Y] += diff    # the re-centering jumps straight there instead of being drawn in between
+            self.altitude += diff    # adds the change to the score
+
+    def raiseFrontier(self):
+        '''
+        Moves the frontier up to where the way up starts again when the player gets past it: the player's feet when they stand on a platform above it (one that
+        breaks), or the top of the screen while a jetpack or TNT carries the player (and the screen) up past everything on it. The frontier isn't moved to where the
+        player is in the middle of a normal jump, since they can't jump again from there
+        '''
+        player = self.player
+        if player.jetpack or player.vel.y < -24:    # going up faster than a jump can, so blown up by TNT
+            top = 0
+        elif player.collision and player.vel.y == 0:
+            top = player.pos[Y] + player.rect[3]
+        else:
+            return
+        if top < self.frontierTop + self.grid.offset:
+            self.frontierTop = top - self.grid.offset
+
+    def generate(self):
+        # Generates a new platform every genSpeed frames, or puts in the next chunks if they are made ahead
+        if self.chunks is not None:
+            self.spliceChunks()
+            return
+
+        # speeds up the platform generation rate as the scrolling speeds up so the density stays the same
+        if self.scrollSpeed == self.startingScroll:
+            self.genSpeed = 30
+        if self.scrollSpeed == self.startingScroll + 1:
+            self.genSpeed = 20
+        if self.scrollSpeed == self.startingScroll + 2:
+            self.genSpeed = 15
+
+        if self.frames%self.genSpeed == 0:    # generates the platforms
+            self.genPlat(-300, -20)
+
+    def spliceChunks(self):
+        '''
+        Makes the platforms (and their tokens and obstacles) that the chunk worker laid out, once they come close to the top of the screen
+        '''
+        for slot in self.chunks.arrived(self.grid.offset):
+            rect = slot.rect.move(0, self.grid.offset)    # from world coordinates to the screen
+            self.addPlat(self.platforms.pool.make(rect, slot.mode, slot.length, slot.spriteType, self, slot.endX))
+
+    def close(self):
+        # stops the chunk worker once the game is finished with
+        if self.chunks is not None:
+            self.chunks.stop()
+
+    def updatePlayer(self, inputs):
+        # updating the player's conditions
+        player = self.player
+        if inputs.space:
+            self.jumps = player.playerJump(self.jumps)
+        if inputs.spaceUp:
+            player.jumpCancel()    # cancels the jump if the spacebar is released
+
+        player.move(inputs)
+        if player.jetpack:
+            player.jetpacking(self)
+        player.collide(self.nearPlayer(self.platforms))
+        player.invincibility()
+
+    def updateObjects(self):
+        # updates everything other than the player, in the same order that they are drawn
+        self.breakPlat()    # update breakable platforms
+        self.updateObstacles()
+        self.updateTokens()
+        self.updatePlatforms()
+        self.updateTNT()
+
+    def updateObstacles(self):
+        for obst in self.nearPlayer(self.obsList):    # obstacles on platforms that broke this frame are already dead, so they aren't returned
+            obst.obsCollide(self)
+
+    def updateTokens(self):
+        for tok in self.nearPlayer(self.tokenList):
+            # calls the functions for the tokens the player picked up
+            if tok.mode == JUMP:
+                tok.doubJumpTok(self)
+            if tok.mode == STAR:
+                tok.starTok(self)
+            if tok.mode == JETPACK:
+                tok.jetpackTok(self)
+
+    def updatePlatforms(self):
+        for plat in self.platforms:
+            # calling platform functions
+            if plat.mode == BREAK:
+                plat.breakMode(self.player)    # updates broken platforms
+            if plat.mode == MOVE:
+                plat.moveMode()   # updates the conditions of moving platforms
+                plat.pathUpdate()
+
+    def updateTNT(self):
+        for tnt in self.nearPlayer(self.TNTList):
+            tnt.explode(self)
+            if tnt.exploded == True:
+                self.TNTList.kill(tnt)    # removes exploded TNT from the list
+
+    def updateScore(self):
+        # Checks for the end of the game and updates the stars, scroll speed and altitude
+        if self.lives == 0 or self.player.pos[Y] > 1000:    # the game ends when the player loses all their lives or goes off the bottom of the screen
+            self.over = True
+
+        if self.stars == 4:    # slows the scrolling down when the player obtains 4 stars
+            self.stars = 0
+            self.scrollSpeed = self.startingScroll
+
+        if self.scrollSpeed < self.startingScroll + 2:
+            self.timer += 1
+
+            if self.timer%(5*FPS) == 0:    # adds to the scroll speed after some amount of time
+                self.scrollSpeed += 1
+                self.timer = 0
+
+        self.altitude += self.scrollSpeed    # update the current altitude
+
+    def stateHash(self):
+        '''
+        A hash of the things that show whether two runs played out the same: the score, lives/jumps/stars, the player and every object's rect
+        '''
+        self.sync()
+        state = [self.frames, self.altitude, self.scrollSpeed, self.lives, self.jumps, self.stars, self.over, tuple(self.player.pos), tuple(self.player.vel)]
+        for lis in self.listList:
+            state.append(tuple(tuple(obj.rect) for obj in lis if not obj.dead))
+        return hashlib.sha1(repr(state).encode()).hexdigest()
+
+    # the following functions are the parts of a frame that work on every object at once - the array backend in EntityArrays.py replaces them
+    def scrollAll(self, distance):
+        # Moves every object down the screen by "distance"
+        for lis in self.listList:
+            scroll(lis, distance)
+        self.grid.scroll(distance)
+
+    def cullAll(self):
+        for lis in self.listList:
+            killPlat(lis, self.grid)
+
+    def nearPlayer(self, objects):
+        # Returns the live objects from the list that are touching the player, found with a single collidelistall() over the list's rects
+        hits = self.player.rect.collidelistall(objects.rects)
+        if not hits:    # most frames the player isn't touching anything in the list
+            return hits
+        return [objects[i] for i in hits if not objects[i].dead]
+
+    def addObject(self, objects, obj):
+        # Adds a new object to one of the lists
+        objects.append(obj)
+
+    def sync(self):
+        # Makes sure that every object's rect is up to date before they are all read (e.g. to be drawn) - they always are here
+        pass
+
+    def breakPlat(self):
+        # Removes breakable platforms and the obstacles on them when they are broken
+        for plat in self.platforms:
+            if plat.mode == BREAK:
+                if plat.visible == False:
+                    self.removePlat(plat)
+
+        for obst in self.obsList:
+            if obst.plat.dead:
+                self.obsList.kill(obst)
+
+    def genPlat(self, range1, range2, climb = False):
+        # Generates a platform in a free place between the heights range1 and range2 - if there isn't one, no platform is made. "climb" is passed to findSpot()
+        if self.chunks is not None:    # the chunk generator makes all the platforms instead
+            return
+        rolled = self.rollPlatform(self.altitude)
+        if rolled is None:
+            return
+        mode, length, rectLength, spriteType = rolled
+
+        spot = self.findSpot(range1, range2, rectLength, mode, climb)
+        if spot is None:    # the band is full, so this platform is skipped instead of holding up the frame
+            return
+        x, y, endX = spot
+        self.addPlat(self.platforms.pool.make(Rect(x, y, rectLength, PLATWIDTH), mode, length, spriteType, self, endX))
+
+    def addPlat(self, plat):
+        '''
+        Adds a newly generated platform to the game along with the token and obstacle on it, so that they are made exactly once, when the platform is
+        '''
+        self.addObject(self.platforms, plat)
+        self.grid.add(plat)
+        self.genTok(plat)
+        self.genObs(plat)
+
+    def removePlat(self, plat):
+        # Takes a platform out of the game: it is tagged in the platform list and taken out of the grid
+        self.platforms.kill(plat)
+        self.grid.remove(plat)
+
+    def genTok(self, plat):
+        '''
+        Generates a token if the platform is marked for one
+        '''
+        if plat.attribute == "TNT":
+            newTok = self.TNTList.pool.make(plat, self)    # Generates new TNT object and adds it to the list
+            self.addObject(self.TNTList, newTok)
+
+        # Generates new token object and adds it to the list
+        if plat.attribute == "jump":
+            newTok = self.tokenList.pool.make(plat, JUMP, self)
+            self.addObject(self.tokenList, newTok)
+
+        if plat.attribute == "star":
+            newTok = self.tokenList.pool.make(plat, STAR, self)
+            self.addObject(self.tokenList, newTok)
+
+        if plat.attribute == "jetpack":
+            newTok = self.tokenList.pool.make(plat, JETPACK, self)
+            self.addObject(self.tokenList, newTok)
+
+    def genObs(self, plat):
+        '''
+        Generates an obstacle if the platform is marked for one
+        '''
+        if plat.obstacle == "spike":
+            newObs = self.obsList.pool.make(plat, SPIKE, self)    # Generates new obstacle and adds it to the list
+            self.addObject(self.obsList, newObs)
+        if plat.obstacle == "laser":
+            if plat.attribute == "none":    # lasers are only put on platforms that do not have a token
+                newObs = self.obsList.pool.make(plat, LASER, self)
+                self.addObject(self.obsList, newObs)
+
+
+
+def makeArcs():
+    '''
+    The full jump, the jump cancelled on every frame that cancelling changes it, and the full jump with a double jump at the top
+    '''
+    full = JumpArc()
+    arcs = [full]
+    frame = 1
+    while True:
+        arc = JumpArc(cancel = frame)
+        if arc.heights == full.heights:    # cancelling only does something while the player is still going up fast
+            break
+        arcs.append(arc)
+        frame += 1
+    arcs.append(JumpArc(double = full.heights.index(max(full.heights)) + 1))    # jumping again from the top of the jump goes highest
+    return arcs
+
+
+arcs = makeArcs()    # every kind of jump, for the reachable difficulties and Autopilot.py
+
+
+def reachHeight():
+    '''
+    How far above a platform a reachable difficulty can put the next one: every height up to it is landed on by a single jump (cancelled early for the low ones)
+    that leaves enough time to move across to anywhere on the screen, going off the side if that is shorter. Less REACHSLACK, so the jump doesn't have to be
+    perfect. Double jumps are never needed, they only make it easier
+    '''
+    speed = Player([0, 0], Rect(0, 0, 57, 81), Random(0)).maxSpeed
+    across = WRAPLEFT // 2    # the furthest the player ever has to move sideways
+    rise = 0
+    while True:
+        reached = False
+        for arc in arcs:
+            frame = arc.landingFrame(rise + 1)
+            if arc.double is None and frame is not None and speed * (frame + 1) >= across:
+                reached = True
+        if not reached:
+            return rise - REACHSLACK
+        rise += 1
+
+
+REACHRISE = reachHeight()
+
+
+# functions
+
+def scroll(objects, speed):
+    # Adds the scroll speed to the objects to make them change position
+    for i in objects:
+        i.rect[Y] += speed
+
+def killPlat(objects, grid):
+    # Removes objects that are no longer visible, and takes them out of the platform grid
+    for obj in objects:
+        if obj.rect[1] > HEIGHT + 500:    # so that lasers will be off the screen when the platforms are removed
+            objects.kill(obj)
+            grid.remove(obj)
+
+
+def packReplay(game):
+    '''
+    The bytes of a replay: the game's difficulty, seed, inputs, score, the frame it ended on and a hash of how it ended. The inputs are one byte per frame, compressed,
+    so a few minutes of play takes a few hundred bytes
+    '''
+    mode = game.gameMode.encode()
+    header = REPLAYMAGIC + REPLAYHEADER.pack(REPLAYVERSION, game.seed, game.chunked, len(mode), int(game.altitude), game.frames) + mode + bytes.fromhex(game.stateHash())
+    return header + zlib.compress(bytes(game.inputLog), 9)
+
+
+def loadReplay(fileName):
+    '''
+    Returns (gameMode, seed, whether it used chunks, inputs as bits, hash of how the game ended, score, the frame the game ended on) from a replay file
+    '''
+    with open(fileName, "rb") as replayFile:
+        data = replayFile.read()
+    if data[:4] != REPLAYMAGIC:
+        raise ValueError(f"{fileName} is not a replay")
+    if len(data) > 4 and data[4] != REPLAYVERSION:    # the version is always the first byte after the magic, so older replays can be told apart
+        raise ValueError(f"{fileName} is replay version {data[4]}, expected {REPLAYVERSION}")
+    if len(data) < 4 + REPLAYHEADER.size:
+        raise ValueError(f"{fileName} is cut short")
+    version, seed, chunked, modeLength, score, endFrame = REPLAYHEADER.unpack_from(data, 4)
+    start = 4 + REPLAYHEADER.size
+    gameMode = data[start:start + modeLength].decode()
+    endHash = data[start + modeLength:start + modeLength + 20].hex()
+    return gameMode, seed, bool(chunked), zlib.decompress(data[start + modeLength + 20:]), endHash, score, endFrame
+
+
+def runReplay(fileName, arrays = False):
+    '''
+    Plays a replay back with no window and returns the GameState and whether it ended exactly the same as when it was recorded
+    '''
+    gameMode, seed, chunked, inputLog, endHash, score, endFrame = loadReplay(fileName)
+    frames = iter(inputLog)
+    game = runHeadless(gameMode, len(inputLog), lambda game: inputsFromBits(next(frames)), arrays, seed, chunked)
+    return game, game.stateHash() == endHash
+
+
+def runHeadless(gameMode, frames, controller = None, arrays = False, seed = None, chunked = False):
+    '''
+    Runs a game with no window and no frame cap for up to "frames" frames, or until the player loses, and returns the GameState.
+    "controller" is a function that takes the GameState and returns the Inputs for the next frame; with no controller the player does nothing.
+    "arrays" uses the NumPy backend from EntityArrays.py, "seed" makes the game the same every time and "chunked" makes the level ahead on a worker thread (Chunks.py)
+    '''
+    if arrays:
+        from EntityArrays import ArrayGameState    # only imported when it is used, since it needs NumPy
+        game = ArrayGameState(gameMode, seed, chunked)
+    else:
+        game = GameState(gameMode, seed, chunked)
+    for i in range(frames):
+        if controller:
+            inputs = controller(game)
+        else:
+            inputs = Inputs()
+        game.step(inputs)
+        if game.over:
+            break
+
+    game.close()
+    return game
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")    # never opens a window
+
+    if len(sys.argv) > 2 and sys.argv[1] == "replay":
+        start = perf_counter()
+        game, same = runReplay(sys.argv[2], len(sys.argv) > 3 and sys.argv[3] == "arrays")
+        elapsed = perf_counter() - start
+        if same:
+            result = "matches the recording"
+        else:
+            result = "DOES NOT match the recording"
+        print(f"{sys.argv[2]}: {game.gameMode}, seed {game.seed}, {game.frames} frames in {elapsed:.3f}s, altitude {int(game.altitude)} - {result}")
+        sys.exit(not same)
+
+    gameMode = "normal"
+    frames = 10000
+    if len(sys.argv) > 1:
+        gameMode = sys.argv[1]
+    if len(sys.argv) > 2:
+        frames = int(sys.argv[2])
+    arrays = "arrays" in sys.argv[3:]
+    chunked = "chunks" in sys.argv[3:]
+    controller = None
+    if "autoplay" in sys.argv[3:]:
+        from Autopilot import Autopilot    # imported here since Autopilot.py imports this file
+        controller = Autopilot().inputs
+
+    start = perf_counter()
+    game = runHeadless(gameMode, frames, controller, arrays = arrays, chunked = chunked)
+    elapsed = perf_counter() - start
+
+    print(f"{gameMode}: {game.frames} frames in {elapsed:.3f}s ({game.frames/elapsed:.0f} frames/s), altitude {int(game.altitude)}")
@@ -0,0 +1,53 @@
+# TextCache.py
+'''
+Caches for drawing text without rendering it with the font every frame, which is one of the slowest things in a frame.
+GlyphText renders each character that a piece of changing text can use (e.g. the digits of the score) once into an atlas, and puts strings together from those glyphs.
+renderText keeps text that doesn't change (like the game over screen) after it is rendered the first time, dropping the least recently used strings once there are too many.
+'''
+
+from pygame import *
+from functools import lru_cache
+
+DIGITS = "0123456789"
+
+
+class GlyphText():
+    '''
+    An atlas of the glyphs of one font in one colour, for text made only of the characters in "chars".
+    blitList() gives the (atlas, position, area) entries that draw a string, so they can go straight into a Surface.blits() batch
+    '''
+    def __init__(self, fnt, colour, chars = DIGITS):
+        self.glyphs = {}    # character: the area of the atlas it is in
+        self.advances = {}    # character: how far along the next character starts
+        glyphs = [fnt.render(char, True, colour) for char in chars]
+        self.height = max(glyph.get_height() for glyph in glyphs)
+
+        self.atlas = Surface((sum(glyph.get_width() for glyph in glyphs), self.height), SRCALPHA)
+        x = 0
+        for i in range(len(chars)):
+            # BLEND_RGBA_MAX copies the glyph's colour and alpha as they are onto the empty atlas, instead of blending them with it
+            self.atlas.blit(glyphs[i], (x, 0), special_flags = BLEND_RGBA_MAX)
+            self.glyphs[chars[i]] = Rect(x, 0, glyphs[i].get_width(), glyphs[i].get_height())
+            self.advances[chars[i]] = fnt.size(chars[i] * 16)[0] / 16    # measured over a run of the character, since the advance is not a whole number of pixels
+            x += glyphs[i].get_width()
+
+    def width(self, text):
+        # the width that the string will take up when drawn
+        if not text:
+            return 0
+        return round(sum(self.advances[char] for char in text[:-1])) + self.glyphs[text[-1]][2]
+
+    def blitList(self, text, pos):
+        # returns the blits that draw "text" with its top left corner at "pos"
+        x, y = pos
+        blits = []
+        for char in text:
+            blits.append((self.atlas, (round(x), y), self.glyphs[char]))
+            x += self.advances[char]
+        return blits
+
+
+@lru_cache(maxsize = 64)
+def renderText(fnt, text, colour):
+    # Renders a string that doesn't change often once and keeps the surface for the next time it is drawn
+    return fnt.render(text, True, colour)
@@ -0,0 +1,130 @@
+# Tuning.py
+'''
+Measures what the difficulty settings do to a game by playing thousands of games with no window, spread over every core with a multiprocessing pool.
+Each game is one task with its own seed, played by the same scripted climber as Benchmark.py until it dies or reaches the frame limit. Any of the settings in
+difficulties.json (movingChance, breakChance, TNTChance, spikeChance, laserChance, startingScroll, ...) can be given a list of values, and every combination of them
+is played with the same seeds, so the differences between combinations come from the settings and not from luck:
+    python Tuning.py hard --games 2000 --set spikeChance=5,10,15 --set laserChance=5,15
+For every combination the report has the altitude reached (percentiles and mean), how long the games lasted, how they ended (out of lives, fell off the bottom, or
+still going at the frame limit), how many heights were tried for each platform that was placed, and the number of each kind of object per frame.
+genSpeed is set by the scroll speed every frame, so changing it does nothing here.
+'''
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random as rand    # random is star-imported by the game's modules, so the module itself is kept under another name
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")    # never opens a window
+
+from Simulation import *
+from Benchmark import climber, percentile, LISTNAMES
+
+MAXFRAMES = 36000    # 10 minutes of play, so a game that never ends still finishes
+ENDINGS = ["lives", "fell", "survived"]    # out of lives, fell off the bottom of the screen, reached the frame limit
+
+
+def playGame(task):
+    '''
+    Plays one game (the work of one task in the pool) and returns what is measured about it: (altitude, frames, ending, heights tried, platforms placed,
+    the total of each kind of object over every frame)
+    '''
+    gameMode, settings, seed, maxFrames = task
+    game = GameState(gameMode, seed, profile = profiles[gameMode].replace(**dict(settings)))
+
+    rnd = rand.Random(seed)
+    objectFrames = [0] * len(game.listList)
+    while game.frames < maxFrames and not game.over:
+        game.step(climber(game, rnd))
+        for i in range(len(game.listList)):
+            objectFrames[i] += len(game.listList[i])
+
+    if game.lives == 0:
+        ending = "lives"
+    elif game.over:
+        ending = "fell"
+    else:
+        ending = "survived"
+    return int(game.altitude), game.frames, ending, game.spotTries, game.spotsFound, objectFrames
+
+
+def summarize(results):
+    '''
+    Puts the results of every game with the same settings together
+    '''
+    games = len(results)
+    altitudes = sorted(result[0] for result in results)
+    frames = sum(result[1] for result in results)
+    spotTries = sum(result[3] for result in results)
+    spotsFound = sum(result[4] for result in results)
+
+    summary = {"games": games, "altitude": {}, "seconds": frames / games / FPS, "endings": {}, "triesPerPlatform": spotTries / max(1, spotsFound),
+               "placementsFailed": 1 - spotsFound / max(1, spotTries), "objectsPerFrame": {}}
+    for p in [10, 50, 90]:
+        summary["altitude"][f"p{p}"] = percentile(altitudes, p)
+    summary["altitude"]["mean"] = sum(altitudes) / games
+    for ending in ENDINGS:
+        summary["endings"][ending] = sum(1 for result in results if result[2] == ending) / games
+    for i in range(len(LISTNAMES)):
+        summary["objectsPerFrame"][LISTNAMES[i]] = sum(result[5][i] for result in results) / max(1, frames)
+    return summary
+
+
+def parseSetting(text):
+    # "name=1,2,3" -> ("name", [1, 2, 3])
+    name, values = text.split("=", 1)
+    return name, [float(value) if "." in value else int(value) for value in values.split(",")]
+
+
+def printSummary(settings, summary):
+    label = ", ".join(f"{name}={value}" for name, value in settings) or "defaults"
+    altitude = summary["altitude"]
+    endings = summary["endings"]
+    print(f"{label}")
+    print(f"    altitude p10 {altitude['p10']:6}  p50 {altitude['p50']:6}  p90 {altitude['p90']:6}  mean {altitude['mean']:8.0f}    {summary['seconds']:6.1f}s a game")
+    print("    ended    " + "  ".join(f"{ending} {endings[ending]*100:5.1f}%" for ending in ENDINGS))
+    print(f"    placing  {summary['triesPerPlatform']:.2f} heights tried a platform, {summary['placementsFailed']*100:.1f}% of tries found no room")
+    print("    objects  " + "  ".join(f"{name} {summary['objectsPerFrame'][name]:.1f}" for name in LISTNAMES) + "  a frame")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Plays many headless games to measure what the difficulty settings do.")
+    parser.add_argument("difficulty", nargs = "?", default = "normal", choices = list(profiles))
+    parser.add_argument("--games", type = int, default = 1000, help = "games played for every combination of settings")
+    parser.add_argument("--set", dest = "settings", action = "append", default = [], metavar = "NAME=V1,V2", help = "values to try for one of the difficulty's settings")
+    parser.add_argument("--frames", type = int, default = MAXFRAMES, help = "the most frames a game is played for")
+    parser.add_argument("--seed", type = int, default = 0, help = "the first seed, the games use the seeds after it")
+    parser.add_argument("--processes", type = int, default = None, help = "how many processes play games (every core by default)")
+    parser.add_argument("--out", default = "tuning.json", help = "where the JSON report is saved")
+    args = parser.parse_args()
+
+    grid = [parseSetting(text) for text in args.settings]
+    for name, values in grid:
+        if name not in PROFILEFIELDS:
+            parser.error(f"{name} is not one of the settings in difficulties.json")
+    names = [name for name, values in grid]
+    combinations = [list(zip(names, values)) for values in itertools.product(*[values for name, values in grid])]
+
+    tasks = []
+    for settings in combinations:
+        for seed in range(args.seed, args.seed + args.games):
+            tasks.append((args.difficulty, settings, seed, args.frames))
+
+    start = perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        # the results come back in the same order as the tasks, a chunk of games at a time so the processes don't wait on each other
+        results = pool.map(playGame, tasks, chunksize = max(1, len(tasks) // (8 * (args.processes or os.cpu_count() or 1))))
+    elapsed = perf_counter() - start
+
+    report = {"difficulty": args.difficulty, "games": args.games, "frames": args.frames, "seed": args.seed, "seconds": elapsed, "combinations": []}
+    for i in range(len(combinations)):
+        summary = summarize(results[i * args.games:(i + 1) * args.games])
+        printSummary(combinations[i], summary)
+        report["combinations"].append({"settings": dict(combinations[i]), **summary})
+
+    with open(args.out, "w") as outFile:
+        json.dump(report, outFile, indent = 2)
+    print(f"{len(tasks)} games in {elapsed:.1f}s, saved to {args.out}")
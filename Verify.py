@@ -0,0 +1,110 @@
+# Verify.py
+'''
+Checks submitted high scores by playing their replays back with no window. Game.py saves a replay for every score that makes the leaderboard (see packReplay):
+the difficulty, the seed and the inputs of every frame, along with the score and the frame that the game ended on. Playing the inputs back from the seed has to
+end the game on exactly that frame, with exactly that score and the same final state, or the score is rejected:
+    python Verify.py replays/normal-1234.replay
+    python Verify.py replays --processes 8 --out verified.jsonl
+Folders are checked for every .replay file in them. Each replay is one task in a multiprocessing pool spread over every core, and each result is printed (and
+written to --out as a line of JSON) as soon as its game has been played, so a big batch can be watched as it goes. Each process plays a game hundreds of times
+faster than real time, since nothing is drawn and nothing waits for the clock, and chunked games lay their chunks out as they need them instead of on a worker thread.
+'''
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import zlib
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")    # never opens a window
+
+from Simulation import *
+
+
+def verifyReplay(fileName):
+    '''
+    Plays one replay back (the work of one task in the pool) and returns what was found as a dict. "ok" is only True if the game ended on the frame that the
+    replay claims, with the score it claims and the same hash of the final state; otherwise "reason" says what was wrong
+    '''
+    result = {"file": fileName, "ok": False, "reason": None}
+    start = perf_counter()
+    try:
+        gameMode, seed, chunked, inputLog, endHash, score, endFrame = loadReplay(fileName)
+    except (OSError, ValueError, zlib.error) as error:    # can't be read, isn't a replay, or is an older version
+        result["reason"] = str(error)
+        return result
+    result.update({"mode": gameMode, "seed": seed, "score": score, "endFrame": endFrame})
+    if gameMode not in profiles:
+        result["reason"] = f"there is no difficulty called {gameMode}"
+        return result
+
+    game = GameState(gameMode, seed, chunked)
+    if game.chunks is not None:
+        game.chunks.threaded = False    # the chunks come out the same on this thread, without the game waiting for a worker that shares the GIL with it
+    for bits in inputLog:
+        game.step(inputsFromBits(bits))
+        if game.over:
+            break
+    game.close()
+    result.update({"altitude": int(game.altitude), "frames": game.frames, "seconds": perf_counter() - start})
+
+    if not game.over:
+        result["reason"] = f"the game hadn't ended after the last of the {len(inputLog)} frames"
+    elif game.frames < len(inputLog):
+        result["reason"] = f"the game ended on frame {game.frames} but the inputs go on to frame {len(inputLog)}"
+    elif game.frames != endFrame:
+        result["reason"] = f"the game ended on frame {game.frames}, the replay claims frame {endFrame}"
+    elif int(game.altitude) != score:
+        result["reason"] = f"the game scored {int(game.altitude)}, the replay claims {score}"
+    elif game.stateHash() != endHash:
+        result["reason"] = "the game didn't end in the same state as when it was recorded"
+    else:
+        result["ok"] = True
+    return result
+
+
+def replayFiles(paths):
+    # the files to check: every .replay file in the folders, and the other paths as they are
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".replay")))
+        else:
+            files.append(path)
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Checks the scores in replays by playing them back with no window.")
+    parser.add_argument("paths", nargs = "+", help = "replay files, or folders of them")
+    parser.add_argument("--processes", type = int, default = None, help = "how many processes play replays (every core by default)")
+    parser.add_argument("--out", default = None, help = "also writes every result to this file as a line of JSON")
+    args = parser.parse_args()
+
+    files = replayFiles(args.paths)
+    outFile = None
+    if args.out:
+        outFile = open(args.out, "w")
+
+    verified = 0
+    frames = 0
+    start = perf_counter()
+    with multiprocessing.Pool(args.processes) as pool:
+        for result in pool.imap_unordered(verifyReplay, files):    # the results come back as each game finishes, not in the order of the files
+            frames += result.get("frames", 0)
+            if result["ok"]:
+                verified += 1
+                print(f"ok      {result['file']}: {result['mode']}, seed {result['seed']}, score {result['score']} on frame {result['endFrame']}", flush = True)
+            else:
+                print(f"FAILED  {result['file']}: {result['reason']}", flush = True)
+            if outFile is not None:
+                outFile.write(json.dumps(result) + "\n")
+                outFile.flush()
+    elapsed = perf_counter() - start
+    if outFile is not None:
+        outFile.close()
+
+    print(f"{verified} of {len(files)} replays verified, {frames} frames in {elapsed:.1f}s ({frames / FPS / max(elapsed, 1e-9):.0f}x real time)")
+    sys.exit(verified != len(files))